@@ -2,10 +2,20 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, date
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
 import plotly.graph_objects as go
 import plotly.express as px
 import pymysql
 from pymysql import MySQLError
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -92,6 +102,339 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+class PoolExhausted(pymysql.err.OperationalError):
+    """Raised when no pooled connection became free in time"""
+
+
+class LoadCancelled(BaseException):
+    """Raised in a load superseded by a newer script run
+    
+    Like Streamlit's own rerun and stop exceptions it derives from
+    BaseException, so it passes through `except Exception` handlers.
+    """
+
+
+class ConnectionPool:
+    """Thread-safe pool of MySQL connections shared by all sessions of the process
+    
+    Idle connections are health-checked with a ping before reuse once they
+    have been idle for a while, and closed after idle_timeout seconds.
+    """
+    
+    def __init__(self, connect_func, max_size=8, idle_timeout=300,
+                 health_check_after=30, acquire_timeout=30):
+        self.connect_func = connect_func
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+        
+        self._idle = []  # (connection, last used) pairs, most recent last
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'evicted': 0,
+            'discarded': 0,
+            'failed_checks': 0,
+            'waits': 0
+        }
+    
+    def _evict_idle(self):
+        """Close connections idle for longer than idle_timeout (lock held)"""
+        cutoff = time.monotonic() - self.idle_timeout
+        keep = []
+        for connection, last_used in self._idle:
+            if last_used < cutoff:
+                self._close(connection)
+                self._stats['evicted'] += 1
+            else:
+                keep.append((connection, last_used))
+        self._idle = keep
+    
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+    
+    def acquire(self, timeout=None, check=None, check_interval=0.25):
+        """Check out a connection, reusing an idle one when possible
+        
+        Waits up to timeout seconds (acquire_timeout by default) for a
+        connection to be released once max_size are in use. While waiting,
+        check is called every check_interval seconds and may raise to give
+        up early.
+        """
+        deadline = time.monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        connection = None
+        last_used = None
+        
+        with self._condition:
+            while True:
+                self._evict_idle()
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted(
+                        2013, f"Connection pool exhausted ({self.max_size} connections in use)"
+                    )
+                self._stats['waits'] += 1
+                if check is None:
+                    self._condition.wait(remaining)
+                else:
+                    self._condition.wait(min(remaining, check_interval))
+                    check()
+        
+        if connection is not None:
+            try:
+                if time.monotonic() - last_used > self.health_check_after:
+                    connection.ping(reconnect=False)
+                with self._condition:
+                    self._stats['reused'] += 1
+                return connection
+            except Exception:
+                self._close(connection)
+                with self._condition:
+                    self._stats['failed_checks'] += 1
+        
+        try:
+            connection = self.connect_func()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        
+        with self._condition:
+            self._stats['created'] += 1
+        return connection
+    
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, or close it when its state is unknown"""
+        with self._condition:
+            self._in_use -= 1
+            if discard or not connection.open:
+                self._close(connection)
+                self._stats['discarded'] += 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._evict_idle()
+            self._condition.notify()
+    
+    def kill_queries(self, thread_ids):
+        """Abort the statements running on the given connections from a side connection"""
+        connection = self.connect_func()
+        try:
+            with connection.cursor() as cursor:
+                for thread_id in thread_ids:
+                    try:
+                        cursor.execute(f"KILL QUERY {int(thread_id)}")
+                    except MySQLError:
+                        # The statement finished in the meantime
+                        pass
+        finally:
+            self._close(connection)
+    
+    @contextmanager
+    def connection(self, timeout=None, check=None, check_interval=0.25):
+        """Borrow a connection for the duration of a with block"""
+        connection = self.acquire(timeout, check, check_interval)
+        try:
+            yield connection
+        except BaseException:
+            self.release(connection, discard=True)
+            raise
+        else:
+            self.release(connection)
+    
+    def stats(self):
+        """Return a snapshot of pool counters"""
+        with self._condition:
+            stats = dict(self._stats)
+            stats['in_use'] = self._in_use
+            stats['idle'] = len(self._idle)
+            stats['max_size'] = self.max_size
+        return stats
+
+
+class ResultCache:
+    """Process-wide LRU cache of loaded frames shared by all sessions
+    
+    Entries expire after ttl seconds; the least recently used ones are
+    evicted once the cached frames exceed max_bytes in total. Frames are
+    handed out as shallow copies, so callers may add or replace columns
+    but must not modify values in place.
+    """
+    
+    def __init__(self, max_bytes=512 * 1024 ** 2, ttl=300):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        
+        self._entries = OrderedDict()  # key -> (frame, size in bytes, stored at), most recent last
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+    
+    def _drop(self, key):
+        """Remove one entry (lock held)"""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+    
+    def get(self, key):
+        """Return a shallow copy of the cached frame, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] > self.ttl:
+                self._drop(key)
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0].copy(deep=False)
+    
+    def put(self, key, df):
+        """Cache a frame, evicting least recently used entries to stay within max_bytes"""
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+            self._entries[key] = (df.copy(deep=False), size, time.monotonic())
+            self._bytes += size
+    
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """Return a snapshot of cache counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution
+    
+    The first caller of a key runs the function; callers arriving while it
+    is still running wait for it and share its result, or its exception,
+    instead of running it again.
+    """
+    
+    def __init__(self):
+        self._calls = {}  # key -> in-flight call
+        self._lock = threading.Lock()
+        self._stats = {
+            'executed': 0,
+            'coalesced': 0
+        }
+    
+    def do(self, key, func, on_wait=None, check=None, check_interval=0.25):
+        """Run func once among concurrent callers of key and return (result, shared)
+        
+        A waiting caller calls check every check_interval seconds, which may
+        raise to stop waiting; the running call is not affected.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {'done': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+                self._stats['executed'] += 1
+            else:
+                self._stats['coalesced'] += 1
+        
+        if not leader:
+            if on_wait is not None:
+                on_wait()
+            if check is None:
+                call['done'].wait()
+            else:
+                while not call['done'].wait(check_interval):
+                    check()
+            if isinstance(call['error'], Exception):
+                raise call['error']
+            if call['error'] is not None:
+                # The leader's script run was stopped or rerun; run it here instead
+                return self.do(key, func, on_wait, check, check_interval)
+            return call['result'], True
+        
+        try:
+            call['result'] = func()
+        except BaseException as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+        return call['result'], False
+    
+    def stats(self):
+        """Return a snapshot of call counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
+
+
+@st.cache_resource(show_spinner=False)
+def get_connection_pool(host, user, password, database, max_size, idle_timeout):
+    """Create the process-wide connection pool (shared across reruns and sessions)"""
+    def connect():
+        return pymysql.connect(
+            host=host,
+            user=user,
+            password=password,
+            database=database,
+            charset='utf8mb4',
+            cursorclass=pymysql.cursors.DictCursor,
+            connect_timeout=10,
+            # Pooled connections must not hold a read snapshot between loads
+            autocommit=True
+        )
+    
+    return ConnectionPool(connect, max_size=max_size, idle_timeout=idle_timeout)
+
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache(max_bytes, ttl):
+    """Create the process-wide result cache (shared across reruns and sessions)"""
+    return ResultCache(max_bytes=max_bytes, ttl=ttl)
+
+
+@st.cache_resource(show_spinner=False)
+def get_single_flight():
+    """Create the process-wide registry of in-flight loads"""
+    return SingleFlight()
+
+
 class PerformanceDashboard:
     def __init__(self):
         # Initialize database connection
@@ -121,6 +464,251 @@ class PerformanceDashboard:
             self.all_products.extend(products)
         self.all_products.append('Airtime Topup')
         
+        # Coded product key: one slot per catalogued product plus 'other',
+        # times one slot per service plus 'no service'
+        self.key_products = [product for products in self.product_categories.values() for product in products]
+        self.key_service_slots = len(self.services) + 1
+        
+        # Columns derived at ingest for internal use only (not shown or exported)
+        self.internal_columns = ['product_key', 'user_key']
+        
+        # Product selections whose matching rows are memoized per session
+        self.selection_memo_size = 8
+        
+        # Transaction columns read by the analytics panels
+        self.transaction_columns = [
+            'id', 'user_identifier', 'entity_name', 'status', 'service_name',
+            'product_name', 'transaction_type', 'amount', 'ucp_name',
+            'wallet_name', 'pouch_name', 'created_at'
+        ]
+        
+        # Onboarding columns read by the analytics panels
+        self.onboarding_columns = [
+            'account_id', 'full_name', 'mobile', 'email', 'region', 'district',
+            'town_village', 'business_name', 'kyc_status', 'registration_date',
+            'updated_at', 'proof_of_id', 'identification_number',
+            'customer_referrer_code', 'customer_referrer_mobile',
+            'referrer_entity', 'entity', 'bank', 'bank_account_name',
+            'bank_account_number', 'status'
+        ]
+        
+        # Wide transaction columns fetched by id only for previews and exports
+        self.transaction_detail_columns = [
+            'transaction_id', 'sub_transaction_id', 'full_name', 'created_by',
+            'internal_status', 'before_balance', 'after_balance', 'reference',
+            'error_code', 'error_message', 'vendor_transaction_id',
+            'vendor_response_code', 'vendor_message', 'slug', 'remarks',
+            'business_hierarchy', 'parent_user_identifier', 'parent_full_name'
+        ]
+        
+        # Column order of the full Transaction record
+        self.transaction_export_columns = [
+            'id', 'user_identifier', 'transaction_id', 'sub_transaction_id',
+            'entity_name', 'full_name', 'created_by', 'status', 'internal_status',
+            'service_name', 'product_name', 'transaction_type', 'amount',
+            'before_balance', 'after_balance', 'ucp_name', 'wallet_name',
+            'pouch_name', 'reference', 'error_code', 'error_message',
+            'vendor_transaction_id', 'vendor_response_code', 'vendor_message',
+            'slug', 'remarks', 'created_at', 'business_hierarchy',
+            'parent_user_identifier', 'parent_full_name'
+        ]
+        
+        # Source queries
+        self.transaction_query = f"""
+            SELECT 
+                {', '.join(self.transaction_columns)}
+            FROM Transaction
+            WHERE created_at BETWEEN %s AND %s
+            ORDER BY created_at
+        """
+        
+        # Keyset pages walk Transaction.id within the date bounds
+        self.transaction_keyset_query = f"""
+            SELECT 
+                {', '.join(self.transaction_columns)}
+            FROM Transaction
+            WHERE created_at BETWEEN %s AND %s
+                AND id > %s
+            ORDER BY id
+            LIMIT %s
+        """
+        
+        # Lowest id inside the date bounds, where the first keyset page starts
+        self.transaction_keyset_start_query = """
+            SELECT MIN(id) AS id
+            FROM Transaction
+            WHERE created_at BETWEEN %s AND %s
+        """
+        
+        # Rows added past a known id, in id order
+        self.transaction_tail_query = f"""
+            SELECT 
+                {', '.join(self.transaction_columns)}
+            FROM Transaction
+            WHERE created_at BETWEEN %s AND %s
+                AND id > %s
+            ORDER BY id
+        """
+        
+        # Today's rows added past the highest id already loaded or polled
+        self.transaction_live_query = f"""
+            SELECT 
+                {', '.join(self.transaction_columns)}
+            FROM Transaction
+            WHERE created_at >= %s
+                AND id > %s
+            ORDER BY id
+        """
+        
+        # Cheap change-detection probes: watermark columns and row count of a window
+        self.transaction_watermark_query = """
+            SELECT 
+                MAX(id) AS id,
+                MAX(created_at) AS created_at,
+                COUNT(*) AS row_count
+            FROM Transaction
+            WHERE created_at BETWEEN %s AND %s
+        """
+        
+        self.onboarding_watermark_query = """
+            SELECT 
+                MAX(registration_date) AS registration_date,
+                MAX(updated_at) AS updated_at,
+                COUNT(*) AS row_count
+            FROM Onboarding
+            WHERE registration_date BETWEEN %s AND %s
+        """
+        
+        self.onboarding_query = f"""
+            SELECT 
+                {', '.join(self.onboarding_columns)}
+            FROM Onboarding
+            WHERE registration_date BETWEEN %s AND %s
+            ORDER BY registration_date
+        """
+        
+        # Hourly rollups behind the period-over-period changes of the snapshot
+        self.transaction_rollup_query = """
+            SELECT 
+                DATE(created_at) AS day,
+                HOUR(created_at) AS hour,
+                TRIM(product_name) AS product_name,
+                TRIM(service_name) AS service_name,
+                COUNT(*) AS all_transactions,
+                COALESCE(SUM(TRIM(status) = 'SUCCESS'), 0) AS total_transactions,
+                COALESCE(SUM(CASE WHEN TRIM(status) = 'SUCCESS' THEN amount END), 0) AS transaction_value
+            FROM Transaction
+            WHERE created_at BETWEEN %s AND %s
+            GROUP BY DATE(created_at), HOUR(created_at), TRIM(product_name), TRIM(service_name)
+        """
+        
+        self.onboarding_rollup_query = """
+            SELECT 
+                DATE(registration_date) AS day,
+                HOUR(registration_date) AS hour,
+                TRIM(status) AS status,
+                COUNT(*) AS registrations
+            FROM Onboarding
+            WHERE registration_date BETWEEN %s AND %s
+                AND TRIM(entity) = 'Customer'
+            GROUP BY DATE(registration_date), HOUR(registration_date), TRIM(status)
+        """
+        
+        # DECIMAL money columns, optionally held as exact integer minor units (butut)
+        self.money_columns = ['amount', 'before_balance', 'after_balance']
+        self.minor_units_per_major = 100
+        
+        # Low-cardinality columns stored dictionary-encoded (categorical) at ingest
+        self.categorical_columns = {
+            'Transaction': [
+                'status', 'entity_name', 'product_name', 'service_name',
+                'transaction_type', 'ucp_name', 'wallet_name', 'pouch_name'
+            ],
+            'Onboarding': ['entity', 'status', 'kyc_status', 'region', 'district']
+        }
+        
+        # How each source table is queried, prepared and partitioned by date
+        self.tables = {
+            'Transaction': {
+                'query': self.transaction_query,
+                'columns': self.transaction_columns,
+                'keyset_query': self.transaction_keyset_query,
+                'keyset_start_query': self.transaction_keyset_start_query,
+                'tail_query': self.transaction_tail_query,
+                'watermark_query': self.transaction_watermark_query,
+                'watermark_columns': ['id', 'created_at'],
+                'rollup_query': self.transaction_rollup_query,
+                'rollup_columns': ['product_name', 'service_name', 'all_transactions', 'total_transactions', 'transaction_value'],
+                'key_column': 'id',
+                'label': 'transaction',
+                'prepare': self.prepare_transactions,
+                'date_column': 'created_at'
+            },
+            'Onboarding': {
+                'query': self.onboarding_query,
+                'columns': self.onboarding_columns,
+                'watermark_query': self.onboarding_watermark_query,
+                'watermark_columns': ['registration_date', 'updated_at'],
+                'rollup_query': self.onboarding_rollup_query,
+                'rollup_columns': ['status', 'registrations'],
+                'label': 'onboarding',
+                'prepare': self.prepare_onboarding,
+                'date_column': 'registration_date'
+            }
+        }
+        
+        # Local day-partitioned cache of closed days (bump the version when the schema changes)
+        self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'partitions', 'v6')
+        
+        # Shared connection pool settings
+        self.pool_max_size = 8
+        self.pool_idle_timeout = 300
+        
+        # Loaded frames shared across sessions: entry lifetime and total size budget
+        self.result_cache_ttl = 300
+        self.result_cache_max_bytes = 512 * 1024 ** 2
+        
+        # Rows pulled per round trip when streaming query results
+        self.fetch_chunk_size = 50000
+        
+        # Rows per keyset page and attempts per page before the load pauses
+        self.keyset_page_size = 50000
+        self.keyset_retries = 3
+        
+        # Gap between adjacent date intervals (BETWEEN bounds are inclusive)
+        self.range_step = timedelta(microseconds=1)
+        
+        # Live tail refresh intervals offered in the sidebar (seconds)
+        self.live_intervals = [10, 15, 30, 60, 120]
+        
+        # Seconds between checks for a superseded run while a load is running
+        self.cancel_poll_interval = 0.25
+        
+        # Ids per round trip when fetching transaction details
+        self.detail_batch_size = 5000
+        
+        # Ingest options (overridden by the sidebar load options)
+        self.load_options = {
+            'streaming': True,
+            'columnar': True,
+            'aggregate_pushdown': False,
+            'partition_cache': True,
+            'result_cache': True,
+            'fetch_strategy': 'Single query',
+            'range_partitions': 4,
+            'exact_money': True,
+            'period_changes': True
+        }
+        
+        # Queries of this script run, killed when a newer run supersedes it
+        self.script_thread = threading.current_thread()
+        self.cancel_event = threading.Event()
+        self.cancel_lock = threading.Lock()
+        self.active_connections = set()
+        
+        # Filtered transactions taken for this script run, with their fingerprint
+        self.analysis_frame = None
+        
         # Initialize session state
         if 'data_loaded' not in st.session_state:
             st.session_state.data_loaded = False
@@ -132,27 +720,77 @@ class PerformanceDashboard:
             st.session_state.start_date = None
         if 'end_date' not in st.session_state:
             st.session_state.end_date = None
-        if 'filtered_transactions' not in st.session_state:
-            st.session_state.filtered_transactions = pd.DataFrame()
+        if 'product_filter' not in st.session_state:
+            st.session_state.product_filter = None
+        if 'filter_unmatched' not in st.session_state:
+            st.session_state.filter_unmatched = False
+        if 'data_version' not in st.session_state:
+            st.session_state.data_version = 0
+        if 'selection_memo' not in st.session_state:
+            st.session_state.selection_memo = {'version': None, 'entries': OrderedDict()}
+        if 'filter_fingerprint' not in st.session_state:
+            st.session_state.filter_fingerprint = None
+        if 'analysis_memo' not in st.session_state:
+            st.session_state.analysis_memo = {}
+        if 'transaction_details' not in st.session_state:
+            st.session_state.transaction_details = pd.DataFrame()
+        if 'transaction_export' not in st.session_state:
+            st.session_state.transaction_export = None
+        if 'selected_products' not in st.session_state:
+            st.session_state.selected_products = []
+        if 'snapshot_metrics' not in st.session_state:
+            st.session_state.snapshot_metrics = None
+        if 'loaded_intervals' not in st.session_state:
+            st.session_state.loaded_intervals = []
+        if 'loaded_transactions' not in st.session_state:
+            st.session_state.loaded_transactions = pd.DataFrame()
+        if 'loaded_onboarding' not in st.session_state:
+            st.session_state.loaded_onboarding = pd.DataFrame()
+        if 'keyset_checkpoints' not in st.session_state:
+            st.session_state.keyset_checkpoints = {}
+        if 'column_memory' not in st.session_state:
+            st.session_state.column_memory = []
+        if 'money_scale' not in st.session_state:
+            st.session_state.money_scale = 1
+        if 'window_key' not in st.session_state:
+            st.session_state.window_key = None
+        if 'data_as_of' not in st.session_state:
+            st.session_state.data_as_of = None
+        if 'live_tail' not in st.session_state:
+            st.session_state.live_tail = None
+        if 'live_rows' not in st.session_state:
+            st.session_state.live_rows = []
+        if 'period_rollups' not in st.session_state:
+            st.session_state.period_rollups = None
+    
+    def get_connection_pool(self):
+        """Return the process-wide connection pool"""
+        return get_connection_pool(
+            self.db_config['host'],
+            self.db_config['user'],
+            self.db_config['password'],
+            self.db_config['database'],
+            self.pool_max_size,
+            self.pool_idle_timeout
+        )
     
     def get_db_connection(self):
-        """Establish MySQL database connection"""
+        """Check out a MySQL database connection from the shared pool"""
         try:
-            connection = pymysql.connect(
-                host=self.db_config['host'],
-                user=self.db_config['user'],
-                password=self.db_config['password'],
-                database=self.db_config['database'],
-                charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor,
-                connect_timeout=10
-            )
-            return connection
+            return self.get_connection_pool().acquire()
         except MySQLError as e:
             st.error(f"Database connection failed: {e}")
             st.info("Please check your database credentials and connection")
             return None
     
+    def release_db_connection(self, connection, discard=False):
+        """Return a connection to the shared pool
+        
+        Connections that failed mid-query are discarded, since an unread
+        streaming result would leave them unusable.
+        """
+        self.get_connection_pool().release(connection, discard=discard)
+    
     def test_db_connection(self):
         """Test database connection"""
         connection = self.get_db_connection()
@@ -161,121 +799,1362 @@ class PerformanceDashboard:
                 with connection.cursor() as cursor:
                     cursor.execute("SELECT 1")
                     result = cursor.fetchone()
-                    connection.close()
-                    return True
+                self.release_db_connection(connection)
+                return True
             except Exception as e:
+                self.release_db_connection(connection, discard=True)
                 st.error(f"Database test failed: {e}")
                 return False
         return False
     
-    def load_data_from_db(self, start_date, end_date):
-        """Load data from MySQL database"""
-        st.session_state.start_date = start_date
-        st.session_state.end_date = end_date
+    def get_result_cache(self):
+        """Return the process-wide result cache"""
+        return get_result_cache(self.result_cache_max_bytes, self.result_cache_ttl)
+    
+    def get_single_flight(self):
+        """Return the process-wide registry of in-flight loads"""
+        return get_single_flight()
+    
+    def result_cache_key(self, table, start_date, end_date):
+        """Key of a loaded table window: table, canonical window and projection
         
-        connection = self.get_db_connection()
-        if not connection:
-            return False
+        The money representation is part of the projection, since it changes
+        the decoded amount columns.
+        """
+        spec = self.tables[table]
+        return (table, self.window_key(start_date, end_date), tuple(spec['columns']), self.money_scale())
+    
+    def display_pool_stats(self):
+        """Display connection pool statistics"""
+        stats = self.get_connection_pool().stats()
+        with st.expander("🔌 Connection Pool"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("In Use", f"{stats['in_use']} / {stats['max_size']}")
+                st.metric("Created", f"{stats['created']:,}")
+                st.metric("Evicted", f"{stats['evicted']:,}")
+            with col2:
+                st.metric("Idle", f"{stats['idle']:,}")
+                st.metric("Reused", f"{stats['reused']:,}")
+                st.metric("Discarded", f"{stats['discarded'] + stats['failed_checks']:,}")
+    
+    def check_cancelled(self):
+        """Stop a worker of a load that has been superseded"""
+        if self.cancel_event.is_set():
+            raise LoadCancelled()
+    
+    @contextmanager
+    def cancellable(self, connection):
+        """Register a connection's running query so a superseded load can kill it
         
+        Errors caused by the kill surface as LoadCancelled.
+        """
+        with self.cancel_lock:
+            self.active_connections.add(connection)
         try:
-            with connection.cursor() as cursor:
-                # Load transactions
-                st.info("Loading transaction data...")
-                
-                transaction_query = """
-                    SELECT 
-                        id, user_identifier, transaction_id, sub_transaction_id,
-                        entity_name, full_name, created_by, status, internal_status,
-                        service_name, product_name, transaction_type, amount,
-                        before_balance, after_balance, ucp_name, wallet_name,
-                        pouch_name, reference, error_code, error_message,
-                        vendor_transaction_id, vendor_response_code, vendor_message,
-                        slug, remarks, created_at, business_hierarchy,
-                        parent_user_identifier, parent_full_name
-                    FROM Transaction
-                    WHERE created_at BETWEEN %s AND %s
-                    ORDER BY created_at
-                """
-                
-                cursor.execute(transaction_query, (start_date, end_date))
-                transactions = cursor.fetchall()
-                
-                # Convert to DataFrame
-                if transactions:
-                    transactions_df = pd.DataFrame(transactions)
-                    
-                    # Parse dates
-                    if 'created_at' in transactions_df.columns:
-                        transactions_df['created_at'] = pd.to_datetime(transactions_df['created_at'], errors='coerce')
-                    
-                    # Clean numeric columns
-                    if 'amount' in transactions_df.columns:
-                        transactions_df['amount'] = pd.to_numeric(transactions_df['amount'], errors='coerce')
-                    
-                    # Clean text columns
-                    text_cols = ['user_identifier', 'product_name', 'entity_name', 'transaction_type', 
-                               'ucp_name', 'service_name', 'status']
-                    for col in text_cols:
-                        if col in transactions_df.columns:
-                            transactions_df[col] = transactions_df[col].astype(str).str.strip()
-                    
-                    st.session_state.transactions = transactions_df
-                    st.session_state.filtered_transactions = transactions_df  # Store for filtering
-                    st.success(f"✅ Loaded {len(transactions_df)} transaction records")
+            self.check_cancelled()
+            yield
+        except MySQLError as e:
+            if self.cancel_event.is_set():
+                raise LoadCancelled() from e
+            raise
+        finally:
+            with self.cancel_lock:
+                self.active_connections.discard(connection)
+    
+    def cancel_load(self):
+        """Cancel the running load: flag its workers and kill its queries on the server"""
+        self.cancel_event.set()
+        with self.cancel_lock:
+            thread_ids = [connection.thread_id() for connection in self.active_connections]
+        if thread_ids:
+            try:
+                self.get_connection_pool().kill_queries(thread_ids)
+            except MySQLError:
+                pass
+    
+    def display_data_freshness(self):
+        """Display when the loaded data was last checked against MySQL"""
+        as_of = st.session_state.data_as_of
+        if as_of is None:
+            return
+        age_minutes = int((datetime.now() - as_of).total_seconds() // 60)
+        age = "just now" if age_minutes < 1 else f"{age_minutes} min ago"
+        freshness = f"🕒 Data as of {as_of.strftime('%b %d, %H:%M:%S')} ({age})"
+        
+        loaded_df = st.session_state.loaded_transactions
+        if loaded_df is not None and not loaded_df.empty:
+            freshness += f"; latest transaction {loaded_df['created_at'].max().strftime('%b %d, %H:%M:%S')}"
+        st.caption(freshness)
+    
+    def display_result_cache_stats(self):
+        """Display shared result cache statistics"""
+        stats = self.get_result_cache().stats()
+        lookups = stats['hits'] + stats['misses']
+        with st.expander("♻️ Result Cache"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Hits", f"{stats['hits']:,}")
+                st.metric("Evictions", f"{stats['evictions']:,}")
+                st.metric("Entries", f"{stats['entries']:,}")
+            with col2:
+                st.metric("Misses", f"{stats['misses']:,}")
+                st.metric("Expired", f"{stats['expirations']:,}")
+                st.metric("Size", f"{stats['bytes'] / 1024 ** 2:,.0f} / {stats['max_bytes'] / 1024 ** 2:,.0f} MB")
+            if lookups:
+                st.caption(f"Hit rate: {stats['hits'] / lookups:.0%}")
+            flights = self.get_single_flight().stats()
+            st.caption(
+                f"Coalesced loads: {flights['coalesced']:,} of {flights['executed'] + flights['coalesced']:,} "
+                f"({flights['in_flight']} in flight)"
+            )
+    
+    def prepare_transactions(self, transactions_df):
+        """Parse dates, numbers and text in a frame of transaction rows"""
+        # Parse dates
+        if 'created_at' in transactions_df.columns:
+            transactions_df['created_at'] = pd.to_datetime(transactions_df['created_at'], errors='coerce')
+        
+        # Clean numeric columns
+        transactions_df = self.prepare_money(transactions_df)
+        
+        # Clean text columns
+        text_cols = ['user_identifier', 'product_name', 'entity_name', 'transaction_type', 
+                   'ucp_name', 'service_name', 'status']
+        transactions_df = self.normalize_text_columns(transactions_df, 'Transaction', text_cols)
+        
+        # Product filters match on one small integer code per row
+        transactions_df['product_key'] = self.product_keys(transactions_df)
+        
+        # Users are counted on 64-bit hashes instead of strings
+        if 'user_identifier' in transactions_df.columns:
+            transactions_df['user_key'] = self.user_keys(transactions_df['user_identifier'])
+        return transactions_df
+    
+    def user_keys(self, series):
+        """64-bit hash of each user identifier; missing identifiers get key 0
+        
+        Hashes do not depend on the chunk a row arrived in, so keys stay
+        comparable across chunks, partitions and loads.
+        """
+        keys = pd.util.hash_pandas_object(series, index=False).to_numpy(copy=True)
+        keys[series.isna().to_numpy()] = 0
+        return keys
+    
+    def value_slots(self, series, values):
+        """Position of each value of series in values, or -1
+        
+        Categorical columns are looked up once per category and mapped
+        through their codes.
+        """
+        index = pd.Index(values)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # The trailing -1 is picked by the -1 code of missing values
+            lookup = np.append(index.get_indexer(series.cat.categories), -1)
+            return lookup[series.cat.codes.to_numpy()]
+        return index.get_indexer(series)
+    
+    def product_keys(self, transactions_df):
+        """Code each transaction's product and service into one int8 key
+        
+        The key is product slot * key_service_slots + service slot, where
+        products outside the catalogue share the last product slot and
+        service slot 0 means no service.
+        """
+        rows = len(transactions_df)
+        if 'product_name' in transactions_df.columns:
+            product_slots = self.value_slots(transactions_df['product_name'], self.key_products)
+            product_slots = np.where(product_slots >= 0, product_slots, len(self.key_products))
+        else:
+            product_slots = np.full(rows, len(self.key_products))
+        if 'service_name' in transactions_df.columns:
+            service_slots = self.value_slots(transactions_df['service_name'], self.services) + 1
+        else:
+            service_slots = np.zeros(rows, dtype=np.int64)
+        return (product_slots * self.key_service_slots + service_slots).astype(np.int8)
+    
+    def prepare_onboarding(self, onboarding_df):
+        """Parse dates and build the merge key in a frame of onboarding rows"""
+        # Parse dates
+        if 'registration_date' in onboarding_df.columns:
+            onboarding_df['registration_date'] = pd.to_datetime(onboarding_df['registration_date'], errors='coerce')
+        
+        if 'updated_at' in onboarding_df.columns:
+            onboarding_df['updated_at'] = pd.to_datetime(onboarding_df['updated_at'], errors='coerce')
+        
+        # Create User Identifier for merging
+        if 'mobile' in onboarding_df.columns:
+            onboarding_df['user_identifier'] = self.normalize_text(onboarding_df['mobile'])
+        
+        return self.normalize_text_columns(onboarding_df, 'Onboarding', [])
+    
+    def money_scale(self):
+        """Minor units per major unit used when loading money columns (1 keeps floats)"""
+        return self.minor_units_per_major if self.load_options.get('exact_money', True) else 1
+    
+    def money_query(self, query):
+        """Rewrite the select list of a query to return money columns as integer minor units
+        
+        With exact money, MySQL scales and rounds each DECIMAL and sends a
+        plain integer, so the driver never builds Decimal objects and no
+        value passes through a float. Columns keep their names.
+        """
+        scale = self.money_scale()
+        if scale == 1:
+            return query
+        select_list, from_keyword, rest = query.partition('FROM')
+        for col in self.money_columns:
+            select_list = re.sub(rf"\b{col}\b", f"CAST(ROUND({col} * {scale}) AS SIGNED) AS {col}", select_list)
+        return select_list + from_keyword + rest
+    
+    def to_minor_units(self, values):
+        """Build an int64 column from money values already in minor units
+        
+        NULLs become missing values of a nullable integer column.
+        """
+        if isinstance(values, pd.Series):
+            if pd.api.types.is_integer_dtype(values):
+                return values
+            values = values.to_numpy(dtype=object, na_value=None)
+        missing = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+        if not missing.any():
+            return np.array(values, dtype=np.int64)
+        minor = np.array([0 if value is None else value for value in values], dtype=np.int64)
+        return pd.arrays.IntegerArray(minor, missing)
+    
+    def prepare_money(self, df):
+        """Type the money columns of a frame of raw rows"""
+        for col in self.money_columns:
+            if col in df.columns:
+                if self.money_scale() > 1:
+                    df[col] = self.to_minor_units(df[col])
                 else:
-                    st.warning("⚠️ No transaction records found in the selected date range")
-                    st.session_state.transactions = pd.DataFrame()
-                    st.session_state.filtered_transactions = pd.DataFrame()
+                    df[col] = pd.to_numeric(df[col], errors='coerce')
+        return df
+    
+    def to_major(self, value):
+        """Convert a money value of the loaded data back to major units"""
+        scale = st.session_state.money_scale
+        if scale == 1 or value is None:
+            return value
+        if isinstance(value, pd.Series):
+            return pd.Series(value.to_numpy(dtype=np.float64, na_value=np.nan), index=value.index, name=value.name) / scale
+        return value / scale
+    
+    def without_internal_columns(self, df):
+        """Return df without the columns derived at ingest for internal use"""
+        internal = [col for col in self.internal_columns if col in df.columns]
+        return df.drop(columns=internal) if internal else df
+    
+    def with_major_units(self, df):
+        """Return df with its money columns in major units, e.g. for exports"""
+        if st.session_state.money_scale == 1:
+            return df
+        return df.assign(**{
+            col: df[col] / st.session_state.money_scale
+            for col in self.money_columns if col in df.columns and pd.api.types.is_integer_dtype(df[col])
+        })
+    
+    def decode_column(self, values, type_code):
+        """Convert one column of raw driver values into a typed NumPy array"""
+        field_type = pymysql.constants.FIELD_TYPE
+        try:
+            if type_code in (field_type.TINY, field_type.SHORT, field_type.LONG,
+                             field_type.LONGLONG, field_type.INT24, field_type.YEAR):
+                # NULLs force a float column, as pandas would infer
+                if None in values:
+                    return np.array(values, dtype=np.float64)
+                return np.array(values, dtype=np.int64)
+            if type_code in (field_type.DECIMAL, field_type.NEWDECIMAL,
+                             field_type.FLOAT, field_type.DOUBLE):
+                return np.array(values, dtype=np.float64)
+            if type_code in (field_type.DATETIME, field_type.TIMESTAMP, field_type.DATE):
+                return np.array(values, dtype='datetime64[us]')
+        except (TypeError, ValueError):
+            # Zero dates and other odd values come back as strings
+            pass
+        
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    
+    def decode_columns(self, rows, description):
+        """Build a DataFrame from tuple rows without creating a dict per row"""
+        names = [col[0] for col in description]
+        if not rows:
+            return pd.DataFrame(columns=names)
+        
+        exact_money = self.money_scale() > 1
+        columns = {}
+        for (name, type_code, *_), values in zip(description, zip(*rows)):
+            if exact_money and name in self.money_columns:
+                columns[name] = self.to_minor_units(values)
+            else:
+                columns[name] = self.decode_column(values, type_code)
+        return pd.DataFrame(columns, copy=False)
+    
+    def normalize_text(self, series, as_category=False):
+        """Strip a text column by normalizing only its distinct values
+        
+        Values are factorized into codes, each distinct value is stripped
+        once and the codes are mapped back, so the cost follows the column's
+        cardinality rather than its length. NULLs stay missing instead of
+        becoming the string 'None'.
+        """
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        stripped = [value.strip() if isinstance(value, str) else str(value).strip() for value in uniques]
+        
+        # Values that only differed by whitespace collapse onto one code
+        if stripped:
+            remap, categories = pd.factorize(pd.Index(stripped))
+            codes = np.where(codes >= 0, remap.take(np.maximum(codes, 0)), -1)
+        else:
+            categories = pd.Index([], dtype=object)
+        normalized = pd.Categorical.from_codes(codes, categories=categories)
+        
+        if as_category:
+            return pd.Series(normalized, index=series.index, name=series.name)
+        return pd.Series(normalized, index=series.index, name=series.name).astype(object)
+    
+    def normalize_text_columns(self, df, table, text_cols):
+        """Normalize text columns; the table's declared low-cardinality columns become categoricals"""
+        categorical = self.categorical_columns.get(table, [])
+        for col in dict.fromkeys(text_cols + categorical):
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = self.normalize_text(df[col], as_category=col in categorical)
+        return df
+    
+    def concat_frames(self, frames):
+        """Concatenate frames row-wise, keeping categorical columns categorical
+        
+        Chunks are encoded independently, so their categories are unioned
+        first; pandas would otherwise fall back to object columns.
+        """
+        if len(frames) == 1:
+            return frames[0]
+        
+        categorical = [
+            col for col in frames[0].columns
+            if isinstance(frames[0][col].dtype, pd.CategoricalDtype)
+            and all(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames)
+        ]
+        if categorical:
+            categories = {}
+            for col in categorical:
+                values = np.concatenate([np.asarray(frame[col].cat.categories, dtype=object) for frame in frames])
+                categories[col] = pd.Index(pd.unique(values))
+            frames = [
+                frame.assign(**{col: frame[col].cat.set_categories(categories[col]) for col in categorical})
+                for frame in frames
+            ]
+        return pd.concat(frames, ignore_index=True)
+    
+    def column_memory_report(self, df, table):
+        """Compare the memory of each categorical column with its object-string equivalent
+        
+        The object size is derived from the categories (pointer per row plus
+        one string object per value), so no object column is materialized.
+        """
+        rows = []
+        for col in self.categorical_columns.get(table, []):
+            if col not in df.columns or not isinstance(df[col].dtype, pd.CategoricalDtype):
+                continue
+            counts = df[col].value_counts(dropna=False)
+            object_bytes = 8 * len(df) + sum(
+                int(count) * sys.getsizeof(value if isinstance(value, str) else np.nan)
+                for value, count in counts.items()
+            )
+            categorical_bytes = df[col].memory_usage(deep=True, index=False)
+            rows.append({
+                'Table': table,
+                'Column': col,
+                'Object MB': object_bytes / 1024 ** 2,
+                'Categorical MB': categorical_bytes / 1024 ** 2,
+                'Saved': f"{(1 - categorical_bytes / object_bytes) * 100:.0f}%" if object_bytes else "0%"
+            })
+        return rows
+    
+    def fetch_query(self, connection, query, params, label, prepare_func, progress=None):
+        """Run a query and build a prepared DataFrame from its rows
+        
+        In streaming mode rows are read through an unbuffered server-side
+        cursor and converted chunk by chunk, so the raw rows of at most one
+        chunk are held in memory next to the growing frame. In columnar mode
+        rows arrive as tuples and are decoded straight into column arrays.
+        Progress goes to the given placeholder, or a new one.
+        """
+        columnar = self.load_options.get('columnar', True)
+        progress = progress or st.empty()
+        query = self.money_query(query)
+        
+        if not self.load_options.get('streaming', True):
+            progress.info(f"Loading {label} data...")
+            cursor_class = pymysql.cursors.Cursor if columnar else pymysql.cursors.DictCursor
+            with self.cancellable(connection), connection.cursor(cursor_class) as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+                if not rows:
+                    return pd.DataFrame()
+                if columnar:
+                    return prepare_func(self.decode_columns(rows, cursor.description))
+            return prepare_func(pd.DataFrame(rows))
+        
+        progress.info(f"Loading {label} data...")
+        
+        chunks = []
+        rows_fetched = 0
+        started = time.perf_counter()
+        
+        cursor_class = pymysql.cursors.SSCursor if columnar else pymysql.cursors.SSDictCursor
+        with self.cancellable(connection), connection.cursor(cursor_class) as cursor:
+            cursor.execute(query, params)
+            while True:
+                self.check_cancelled()
+                rows = cursor.fetchmany(self.fetch_chunk_size)
+                if not rows:
+                    break
                 
-                # Load onboarding data
-                st.info("Loading onboarding data...")
+                if columnar:
+                    chunk_df = self.decode_columns(rows, cursor.description)
+                else:
+                    chunk_df = pd.DataFrame(rows)
+                chunks.append(prepare_func(chunk_df))
+                rows_fetched += len(rows)
+                del rows
                 
-                onboarding_query = """
-                    SELECT 
-                        account_id, full_name, mobile, email, region, district,
-                        town_village, business_name, kyc_status, registration_date,
-                        updated_at, proof_of_id, identification_number,
-                        customer_referrer_code, customer_referrer_mobile,
-                        referrer_entity, entity, bank, bank_account_name,
-                        bank_account_number, status
-                    FROM Onboarding
-                    WHERE registration_date BETWEEN %s AND %s
-                    ORDER BY registration_date
-                """
+                elapsed = time.perf_counter() - started
+                rate = rows_fetched / elapsed if elapsed > 0 else 0
+                progress.info(f"Loading {label} data... {rows_fetched:,} rows ({rate:,.0f} rows/sec)")
+        
+        elapsed = time.perf_counter() - started
+        rate = rows_fetched / elapsed if elapsed > 0 else 0
+        progress.info(f"Fetched {rows_fetched:,} {label} rows in {elapsed:.1f}s ({rate:,.0f} rows/sec)")
+        
+        if not chunks:
+            return pd.DataFrame()
+        if len(chunks) == 1:
+            return chunks[0]
+        return self.concat_frames(chunks)
+    
+    def missing_intervals(self, start_date, end_date, loaded_intervals):
+        """Return the parts of [start_date, end_date] not covered by the loaded intervals"""
+        missing = []
+        cursor = start_date
+        for loaded_start, loaded_end in sorted(loaded_intervals):
+            if loaded_end < cursor:
+                continue
+            if loaded_start > end_date:
+                break
+            if loaded_start > cursor:
+                missing.append((cursor, loaded_start - self.range_step))
+            cursor = max(cursor, loaded_end + self.range_step)
+            if cursor > end_date:
+                break
+        
+        if cursor <= end_date:
+            missing.append((cursor, end_date))
+        return missing
+    
+    def slice_range(self, df, date_column, start_date, end_date):
+        """Slice the rows of df whose date_column falls inside the range
+        
+        Frames are kept sorted by their date column, so the bounds are found
+        with a binary search and the result is a contiguous slice.
+        """
+        if df is None or df.empty or date_column not in df.columns:
+            return pd.DataFrame()
+        dates = df[date_column]
+        lower = dates.searchsorted(pd.Timestamp(start_date), side='left')
+        upper = dates.searchsorted(pd.Timestamp(end_date), side='right')
+        return df.iloc[lower:upper]
+    
+    def slice_loaded_data(self, start_date, end_date):
+        """Serve a range covered by the loaded data without querying MySQL"""
+        st.session_state.start_date = start_date
+        st.session_state.end_date = end_date
+        st.session_state.window_key = self.window_key(start_date, end_date)
+        
+        loaded_df = st.session_state.loaded_transactions
+        transactions_df = self.slice_range(loaded_df, 'created_at', start_date, self.view_end(loaded_df, end_date))
+        self.set_transactions(transactions_df)
+        st.session_state.transaction_export = None
+        
+        st.session_state.onboarding = self.slice_range(st.session_state.loaded_onboarding, 'registration_date', start_date, end_date)
+        st.session_state.live_tail = None
+        
+        return len(transactions_df), len(st.session_state.onboarding)
+    
+    def view_end(self, loaded_df, end_date):
+        """End of the transactions shown for a window
+        
+        A window that reaches today also shows the rows polled by the live
+        tail past its end, up to the newest loaded row.
+        """
+        if loaded_df is None or loaded_df.empty or end_date < datetime.combine(date.today(), datetime.min.time()):
+            return end_date
+        return max(pd.Timestamp(end_date), loaded_df['created_at'].iloc[-1])
+    
+    def merge_live_rows(self):
+        """Append the rows polled by the live tail to the loaded transactions
+        
+        Polls only collect their new rows; they are merged here once per full
+        script run, so the panels reflect them without the window's canonical
+        end changing.
+        """
+        live_rows = st.session_state.live_rows
+        if not live_rows:
+            return
+        st.session_state.live_rows = []
+        
+        loaded_df = st.session_state.loaded_transactions
+        merged_df = self.concat_frames([loaded_df] + live_rows if not loaded_df.empty else live_rows)
+        if not merged_df['created_at'].is_monotonic_increasing:
+            merged_df = merged_df.sort_values('created_at', kind='stable', ignore_index=True)
+        st.session_state.loaded_transactions = merged_df
+        
+        start_date = st.session_state.start_date
+        self.set_transactions(self.slice_range(merged_df, 'created_at', start_date, self.view_end(merged_df, st.session_state.end_date)))
+        st.session_state.transaction_export = None
+    
+    def split_range(self, start_date, end_date, parts):
+        """Split [start_date, end_date] into up to `parts` adjacent sub-ranges of equal length"""
+        span = end_date - start_date
+        parts = max(1, min(parts, int(span.total_seconds() // 60)))
+        if parts == 1:
+            return [(start_date, end_date)]
+        
+        # Interior boundaries fall on whole minutes
+        bounds = [start_date]
+        for index in range(1, parts):
+            bounds.append((start_date + span * index / parts).replace(second=0, microsecond=0))
+        bounds.append(end_date + self.range_step)
+        return [(bounds[index], bounds[index + 1] - self.range_step) for index in range(parts)]
+    
+    def fetch_interval(self, connection, table, start_date, end_date):
+        """Fetch one interval of a table from MySQL
+        
+        With the range-partitioned strategy the interval is split into
+        sub-ranges that run concurrently and are concatenated in date order.
+        The table's own connection and any extra pooled connections free
+        right now take sub-ranges from a shared queue, so a busy pool only
+        lowers the parallelism instead of failing the load. With keyset
+        pages, tables that have a key column are read page by page.
+        """
+        spec = self.tables[table]
+        if self.load_options.get('fetch_strategy') == 'Keyset pages' and 'keyset_query' in spec:
+            return self.fetch_keyset(connection, table, start_date, end_date)
+        
+        parts = 1
+        if self.load_options.get('fetch_strategy') == 'Range-partitioned':
+            # Both tables load at once, so each gets at most half the pool
+            parts = min(self.load_options.get('range_partitions', 1), self.max_range_partitions())
+        ranges = self.split_range(start_date, end_date, parts)
+        
+        if len(ranges) == 1:
+            return self.fetch_query(connection, spec['query'], (start_date, end_date), spec['label'], spec['prepare'])
+        
+        container = st.container()
+        timings = [0.0] * len(ranges)
+        frames = [None] * len(ranges)
+        queue = list(range(len(ranges)))
+        queue_lock = threading.Lock()
+        
+        def drain(part_connection):
+            while True:
+                self.check_cancelled()
+                with queue_lock:
+                    if not queue:
+                        return
+                    index = queue.pop(0)
+                range_start, range_end = ranges[index]
+                started = time.perf_counter()
+                with container:
+                    frames[index] = self.fetch_query(part_connection, spec['query'], (range_start, range_end), spec['label'], spec['prepare'])
+                timings[index] = time.perf_counter() - started
+        
+        def fetch_parts(worker):
+            if worker == 0:
+                drain(connection)
+                return
+            try:
+                part_connection = self.get_connection_pool().acquire(timeout=0)
+            except PoolExhausted:
+                # No spare connection; the remaining workers take this one's share
+                return
+            discard = True
+            try:
+                drain(part_connection)
+                discard = False
+            finally:
+                self.release_db_connection(part_connection, discard=discard)
+        
+        started = time.perf_counter()
+        self.run_parallel([lambda worker=worker: fetch_parts(worker) for worker in range(len(ranges))])
+        elapsed = time.perf_counter() - started
+        
+        serial = sum(timings)
+        speedup = serial / elapsed if elapsed > 0 else 1
+        container.caption(
+            f"⚡ {spec['label'].capitalize()}: {len(ranges)} range queries in {elapsed:.1f}s "
+            f"(serial ≈ {serial:.1f}s, {speedup:.1f}× speedup)"
+        )
+        
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        return self.concat_frames(frames)
+    
+    def max_range_partitions(self):
+        """Most range queries one table may run at once"""
+        return max(self.pool_max_size // 2, 2)
+    
+    def fetch_keyset(self, connection, table, start_date, end_date):
+        """Fetch one interval of a table in keyset pages of `id > last_id LIMIT n`
+        
+        Pages avoid a server-side sort of the whole range, and the first page
+        starts at the lowest id inside the date bounds, so the first rows
+        arrive quickly. Pages are read on the table's own connection. A failed
+        page is retried on a spare pooled connection when one is free right
+        away, otherwise on the same connection reopened, so retries never wait
+        for the pool. If a page keeps failing, the pages fetched so far are
+        kept as a checkpoint and the next load of the same interval resumes
+        after the last id instead of starting over.
+        """
+        spec = self.tables[table]
+        key_column = spec['key_column']
+        checkpoint_key = (table, start_date, end_date)
+        checkpoint = st.session_state.keyset_checkpoints.get(checkpoint_key)
+        if checkpoint is not None and checkpoint['pages']:
+            st.caption(f"↪️ Resuming {spec['label']} load after id {checkpoint['last_id']:,}")
+        else:
+            with self.cancellable(connection), connection.cursor(pymysql.cursors.Cursor) as cursor:
+                cursor.execute(spec['keyset_start_query'], (start_date, end_date))
+                first_id = cursor.fetchone()[0]
+            if first_id is None:
+                return pd.DataFrame()
+            checkpoint = {'last_id': int(first_id) - 1, 'pages': []}
+        
+        page_connection = connection
+        spare = None
+        
+        def retry_connection():
+            nonlocal spare
+            if spare is not None:
+                # The spare failed as well
+                self.release_db_connection(spare, discard=True)
+                spare = None
+            try:
+                spare = self.get_connection_pool().acquire(timeout=0)
+                return spare
+            except PoolExhausted:
+                connection.ping(reconnect=True)
+                return connection
+        
+        progress = st.empty()
+        started = time.perf_counter()
+        discard = True
+        try:
+            while True:
+                for attempt in range(1, self.keyset_retries + 1):
+                    try:
+                        if attempt > 1:
+                            page_connection = retry_connection()
+                        page_df = self.fetch_query(
+                            page_connection, spec['keyset_query'],
+                            (start_date, end_date, checkpoint['last_id'], self.keyset_page_size),
+                            spec['label'], spec['prepare'], progress=progress
+                        )
+                        break
+                    except MySQLError as e:
+                        if attempt == self.keyset_retries:
+                            st.session_state.keyset_checkpoints[checkpoint_key] = checkpoint
+                            raise pymysql.err.OperationalError(
+                                2013, f"{spec['label'].capitalize()} page after id {checkpoint['last_id']:,} failed "
+                                      f"{attempt} times ({e}); load again to resume"
+                            )
+                        progress.warning(f"⚠️ Retrying {spec['label']} page after id {checkpoint['last_id']:,} ({e})")
                 
-                cursor.execute(onboarding_query, (start_date, end_date))
-                onboarding = cursor.fetchall()
+                if page_df.empty:
+                    break
+                checkpoint['pages'].append(page_df)
+                checkpoint['last_id'] = int(page_df[key_column].iloc[-1])
                 
-                if onboarding:
-                    onboarding_df = pd.DataFrame(onboarding)
-                    
-                    # Parse dates
-                    if 'registration_date' in onboarding_df.columns:
-                        onboarding_df['registration_date'] = pd.to_datetime(onboarding_df['registration_date'], errors='coerce')
-                    
-                    if 'updated_at' in onboarding_df.columns:
-                        onboarding_df['updated_at'] = pd.to_datetime(onboarding_df['updated_at'], errors='coerce')
-                    
-                    # Create User Identifier for merging
-                    if 'mobile' in onboarding_df.columns:
-                        onboarding_df['user_identifier'] = onboarding_df['mobile'].astype(str).str.strip()
+                rows_fetched = sum(len(page) for page in checkpoint['pages'])
+                elapsed = time.perf_counter() - started
+                progress.info(f"Loading {spec['label']} data... {len(checkpoint['pages'])} page(s), {rows_fetched:,} rows in {elapsed:.1f}s")
+                if len(page_df) < self.keyset_page_size:
+                    break
+            discard = False
+        finally:
+            if spare is not None:
+                self.release_db_connection(spare, discard=discard)
+        
+        st.session_state.keyset_checkpoints.pop(checkpoint_key, None)
+        if not checkpoint['pages']:
+            return pd.DataFrame()
+        
+        # Pages arrive in id order; the dashboard keeps frames in date order
+        interval_df = self.concat_frames(checkpoint['pages'])
+        return interval_df.sort_values(spec['date_column'], kind='stable', ignore_index=True)
+    
+    def partition_path(self, table, day):
+        """Path of the cached partition holding one closed day of a table"""
+        money = 'minor' if self.money_scale() > 1 else 'major'
+        return os.path.join(self.cache_dir, money, table, f"{day.isoformat()}.parquet")
+    
+    def write_cached(self, path, df):
+        """Write a cache file atomically
+        
+        Each writer uses its own temporary file in the target directory, so
+        sessions caching the same day concurrently never write into each
+        other's file; the last complete one wins.
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                df.to_parquet(temp_file, index=False)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def read_cached(self, path):
+        """Read a cache file, or return None when it is missing or unreadable
+        
+        Unreadable files are deleted so the day is fetched and cached again.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            st.warning(f"⚠️ Discarding unreadable cache file {os.path.basename(path)}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+    
+    def write_partition(self, table, day, day_df):
+        """Persist one closed day of a table, replacing the file atomically"""
+        self.write_cached(self.partition_path(table, day), day_df)
+    
+    def rewrite_partitions(self, table, window_df, start_date, end_date):
+        """Replace the cached closed days of a window with freshly reloaded rows
+        
+        Days the window covers completely are rewritten from window_df; a
+        partly covered first or last day is deleted and fetched again on the
+        next load that needs it.
+        """
+        if not self.load_options.get('partition_cache', True):
+            return
+        
+        date_column = self.tables[table]['date_column']
+        first_day = start_date.date()
+        last_closed_day = min(end_date.date(), date.today() - timedelta(days=1))
+        day = first_day
+        while day <= last_closed_day:
+            day_start = datetime.combine(day, datetime.min.time())
+            day_end = datetime.combine(day, datetime.max.time())
+            path = self.partition_path(table, day)
+            try:
+                if start_date <= day_start and day_end <= end_date:
+                    day_df = self.slice_range(window_df, date_column, day_start, day_end)
+                    self.write_partition(table, day, day_df.reset_index(drop=True))
+                elif os.path.exists(path):
+                    os.remove(path)
+            except Exception as e:
+                st.warning(f"⚠️ Could not update cached {table} partition {day}: {e}")
+            day += timedelta(days=1)
+    
+    def fetch_range(self, connection, table, start_date, end_date):
+        """Fetch one interval of a table, serving closed days from the local partition cache
+        
+        Closed days (before today) never change, so each is fetched from MySQL
+        once and stored as a Parquet file per day. Today is always queried
+        live. Returns the frame and the number of rows read from MySQL.
+        """
+        spec = self.tables[table]
+        date_column = spec['date_column']
+        
+        if not self.load_options.get('partition_cache', True):
+            interval_df = self.fetch_interval(connection, table, start_date, end_date)
+            return interval_df, len(interval_df)
+        
+        today = date.today()
+        first_day = start_date.date()
+        last_closed_day = min(end_date.date(), today - timedelta(days=1))
+        closed_days = [first_day + timedelta(days=offset) for offset in range((last_closed_day - first_day).days + 1)]
+        
+        day_frames = {}
+        fetched = 0
+        
+        for day in closed_days:
+            day_df = self.read_cached(self.partition_path(table, day))
+            if day_df is not None:
+                day_frames[day] = day_df
+        cached_days = len(day_frames)
+        if cached_days:
+            st.caption(f"📁 {cached_days} {spec['label']} day(s) read from the local cache")
+        
+        # Fetch each run of consecutive uncached days with one query
+        missing_runs = []
+        for day in closed_days:
+            if day in day_frames:
+                continue
+            if missing_runs and missing_runs[-1][1] == day - timedelta(days=1):
+                missing_runs[-1][1] = day
+            else:
+                missing_runs.append([day, day])
+        
+        for run_start, run_end in missing_runs:
+            run_df = self.fetch_interval(
+                connection, table,
+                datetime.combine(run_start, datetime.min.time()), datetime.combine(run_end, datetime.max.time())
+            )
+            fetched += len(run_df)
+            day = run_start
+            while day <= run_end:
+                day_df = self.slice_range(
+                    run_df, date_column,
+                    datetime.combine(day, datetime.min.time()), datetime.combine(day, datetime.max.time())
+                )
+                if day_df.empty:
+                    day_df = run_df.iloc[0:0]
+                try:
+                    self.write_partition(table, day, day_df)
+                except Exception as e:
+                    st.warning(f"⚠️ Could not cache {table} partition {day}: {e}")
+                day_frames[day] = day_df
+                day += timedelta(days=1)
+        
+        pieces = [day_frames[day] for day in closed_days if not day_frames[day].empty]
+        
+        # Today is still changing and always comes from MySQL
+        live_start = max(start_date, datetime.combine(today, datetime.min.time()))
+        if live_start <= end_date:
+            live_df = self.fetch_interval(connection, table, live_start, end_date)
+            fetched += len(live_df)
+            if not live_df.empty:
+                pieces.append(live_df)
+        
+        if not pieces:
+            return pd.DataFrame(), fetched
+        interval_df = self.concat_frames(pieces)
+        return self.slice_range(interval_df, date_column, start_date, end_date).reset_index(drop=True), fetched
+    
+    def rollup_path(self, table, day):
+        """Path of the cached hourly rollup of one closed day of a table"""
+        return os.path.join(self.cache_dir, 'rollups', table, f"{day.isoformat()}.parquet")
+    
+    def query_rollups(self, connection, table, start_date, end_date):
+        """Aggregate a table into one row per hour and group inside MySQL"""
+        spec = self.tables[table]
+        with self.cancellable(connection), connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(spec['rollup_query'], (start_date, end_date))
+            rows = cursor.fetchall()
+        
+        rollup_df = pd.DataFrame(rows, columns=['day', 'hour'] + spec['rollup_columns'])
+        rollup_df.insert(0, 'hour_start', pd.to_datetime(rollup_df['day']) + pd.to_timedelta(rollup_df['hour'].astype('int64'), unit='h'))
+        rollup_df = rollup_df.drop(columns=['day', 'hour'])
+        for col in spec['rollup_columns']:
+            if col in ('product_name', 'service_name', 'status'):
+                rollup_df[col] = rollup_df[col].astype(object)
+            else:
+                # SUM over DECIMAL arrives as Decimal; changes only need floats
+                rollup_df[col] = rollup_df[col].astype('float64')
+        return rollup_df
+    
+    def fetch_rollups(self, connection, table, start_date, end_date):
+        """Hourly rollups of the days between two dates, serving closed days from the local cache
+        
+        Like fetch_range, each run of consecutive uncached closed days is
+        aggregated with one query and stored as one small Parquet file per
+        day; today is always aggregated live.
+        """
+        use_cache = self.load_options.get('partition_cache', True)
+        today = date.today()
+        first_day = start_date.date()
+        last_day = end_date.date()
+        days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+        
+        day_frames = {}
+        missing_runs = []
+        for day in days:
+            if day >= today:
+                break
+            day_df = self.read_cached(self.rollup_path(table, day)) if use_cache else None
+            if day_df is not None:
+                day_frames[day] = day_df
+            elif missing_runs and missing_runs[-1][1] == day - timedelta(days=1):
+                missing_runs[-1][1] = day
+            else:
+                missing_runs.append([day, day])
+        
+        for run_start, run_end in missing_runs:
+            run_df = self.query_rollups(
+                connection, table,
+                datetime.combine(run_start, datetime.min.time()), datetime.combine(run_end, datetime.max.time())
+            )
+            run_days = run_df['hour_start'].dt.date
+            day = run_start
+            while day <= run_end:
+                day_df = run_df[run_days == day].reset_index(drop=True)
+                if use_cache:
+                    try:
+                        self.write_cached(self.rollup_path(table, day), day_df)
+                    except Exception as e:
+                        st.warning(f"⚠️ Could not cache {table} rollup {day}: {e}")
+                day_frames[day] = day_df
+                day += timedelta(days=1)
+        
+        pieces = [day_frames[day] for day in days if day in day_frames]
+        if last_day >= today:
+            pieces.append(self.query_rollups(
+                connection, table, max(start_date, datetime.combine(today, datetime.min.time())), end_date
+            ))
+        rollup_df = pd.concat(pieces, ignore_index=True)
+        return rollup_df[(rollup_df['hour_start'] >= start_date) & (rollup_df['hour_start'] <= end_date)]
+    
+    def previous_window(self, start_date, end_date):
+        """The window of equal length that ends just before start_date"""
+        length = end_date - start_date + self.range_step
+        return start_date - length, start_date - self.range_step
+    
+    def period_rollups(self, start_date, end_date):
+        """Hourly rollups of the window preceding the given one, kept per session
+        
+        Returns None when they cannot be read; the failure is remembered for
+        the window so reruns do not keep querying.
+        """
+        previous_start, previous_end = self.previous_window(start_date, end_date)
+        key = self.window_key(previous_start, previous_end)
+        cached = st.session_state.period_rollups
+        if cached is not None and cached['window_key'] == key:
+            return cached['rollups']
+        
+        connection = self.get_db_connection()
+        if not connection:
+            return None
+        
+        def rollup_task():
+            return {
+                table: self.fetch_rollups(connection, table, previous_start, previous_end)
+                for table in self.tables
+            }
+        
+        rollups = None
+        discard = False
+        try:
+            # Run in a worker so a superseded run can cancel the aggregates
+            rollups = self.run_parallel([rollup_task])[0]
+            rollups['start_date'] = previous_start
+            rollups['end_date'] = previous_end
+        except Exception as e:
+            discard = True
+            st.caption(f"⚠️ Period-over-period changes unavailable: {e}")
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            self.release_db_connection(connection, discard=discard)
+        
+        st.session_state.period_rollups = {'window_key': key, 'rollups': rollups}
+        return rollups
+    
+    def clear_partition_cache(self):
+        """Delete all locally cached partitions and rollups"""
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                os.remove(os.path.join(root, name))
+                removed += 1
+        return removed
+    
+    def load_table_range(self, connection, table, loaded_df, missing, start_date, end_date):
+        """Fetch the missing intervals of a table and merge them with the rows already loaded
+        
+        Returns the merged frame, ordered by the table's date column and
+        limited to [start_date, end_date], and the number of rows read from
+        MySQL.
+        """
+        date_column = self.tables[table]['date_column']
+        pieces = []
+        reused_df = self.slice_range(loaded_df, date_column, start_date, end_date)
+        if not reused_df.empty:
+            pieces.append((reused_df[date_column].iloc[0], reused_df))
+        
+        fetched = 0
+        for interval_start, interval_end in missing:
+            interval_df, interval_fetched = self.fetch_range(connection, table, interval_start, interval_end)
+            fetched += interval_fetched
+            if not interval_df.empty:
+                pieces.append((interval_start, interval_df))
+        
+        if not pieces:
+            return pd.DataFrame(), fetched
+        if len(pieces) == 1:
+            return pieces[0][1].reset_index(drop=True), fetched
+        
+        # Intervals never overlap, so ordering the pieces keeps rows sorted by date
+        pieces.sort(key=lambda piece: piece[0])
+        return self.concat_frames([piece[1] for piece in pieces]), fetched
+    
+    def run_parallel(self, tasks, max_workers=None):
+        """Run callables concurrently and return their results in order
+        
+        Worker threads are attached to the current script run so they can
+        write progress into the page. While waiting, the script thread
+        updates an elapsed-time note; that write is where Streamlit stops a
+        run superseded by a widget change, and the load's queries are then
+        killed and its partial results dropped.
+        """
+        ctx = get_script_run_ctx()
+        in_script_thread = threading.current_thread() is self.script_thread
+        
+        def attach_context():
+            if ctx is not None:
+                add_script_run_ctx(threading.current_thread(), ctx)
+        
+        with ThreadPoolExecutor(max_workers=max_workers or len(tasks), initializer=attach_context) as executor:
+            futures = [executor.submit(task) for task in tasks]
+            try:
+                heartbeat = st.empty() if in_script_thread else None
+                started = time.perf_counter()
+                pending = set(futures)
+                while pending:
+                    _, pending = wait(pending, timeout=self.cancel_poll_interval)
+                    if heartbeat is not None:
+                        heartbeat.caption(f"⏱️ {time.perf_counter() - started:.0f}s elapsed")
+                    self.check_cancelled()
+                if heartbeat is not None:
+                    heartbeat.empty()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                self.cancel_load()
+                raise
+            return [future.result() for future in futures]
+    
+    def watermark_value(self, value):
+        """Normalize one watermark value so MySQL and pandas values compare equal"""
+        if value is None or pd.isna(value):
+            return None
+        if isinstance(value, (datetime, np.datetime64)):
+            return pd.Timestamp(value)
+        return int(value)
+    
+    def watermark(self, table, df):
+        """Watermark of loaded rows: the maximum of each watermark column and the row count"""
+        columns = self.tables[table]['watermark_columns']
+        if df is None or df.empty:
+            return (None,) * len(columns) + (0,)
+        return tuple(self.watermark_value(df[col].max()) for col in columns) + (len(df),)
+    
+    def probe_watermark(self, connection, table, start_date, end_date):
+        """Read the watermark of a window from MySQL with one aggregate query"""
+        with self.cancellable(connection), connection.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(self.tables[table]['watermark_query'], (start_date, end_date))
+            row = cursor.fetchone()
+        return tuple(self.watermark_value(value) for value in row[:-1]) + (int(row[-1] or 0),)
+    
+    def refresh_window(self, connection, table, base_df, start_date, end_date):
+        """Bring rows loaded earlier for a window up to date
+        
+        A watermark probe is compared with the loaded rows first. When they
+        match, nothing else is read. When rows were only added past the
+        highest loaded id, just those rows are fetched and merged in; any
+        other change reloads the window. Returns the frame and the number of
+        rows read from MySQL.
+        """
+        spec = self.tables[table]
+        label = spec['label']
+        remote = self.probe_watermark(connection, table, start_date, end_date)
+        local = self.watermark(table, base_df)
+        if local == remote:
+            st.caption(f"✔️ {label.capitalize()} rows unchanged since they were loaded")
+            return base_df, 0
+        
+        if 'tail_query' in spec and remote[-1] > local[-1]:
+            last_id = int(base_df[spec['key_column']].max()) if not base_df.empty else 0
+            tail_df = self.fetch_query(connection, spec['tail_query'], (start_date, end_date, last_id), label, spec['prepare'])
+            if not tail_df.empty:
+                merged_df = self.concat_frames([base_df, tail_df]).sort_values(spec['date_column'], kind='stable', ignore_index=True)
+                if self.watermark(table, merged_df) == remote:
+                    st.caption(f"⬆️ {len(tail_df):,} new {label} rows fetched past id {last_id:,}")
+                    return merged_df, len(tail_df)
+        
+        # Rows were updated or deleted, so the local day cache is stale too
+        st.caption(f"🔄 {label.capitalize()} rows changed; reloading the window")
+        window_df = self.fetch_interval(connection, table, start_date, end_date)
+        self.rewrite_partitions(table, window_df, start_date, end_date)
+        return window_df, len(window_df)
+    
+    def load_table(self, table, loaded_df, missing, start_date, end_date, container):
+        """Load one table window on its own pooled connection
+        
+        Rows already at hand, from the shared result cache or from this
+        session when the window is fully loaded, are only checked with a
+        watermark probe and topped up. Otherwise the missing intervals are
+        fetched. A session asking for a window that another session is
+        loading right now waits for that load and shares its rows instead of
+        querying MySQL again.
+        """
+        use_cache = self.load_options.get('result_cache', True)
+        cache_key = self.result_cache_key(table, start_date, end_date)
+        label = self.tables[table]['label']
+        
+        def load_window():
+            with container:
+                with self.get_connection_pool().connection(
+                    check=self.check_cancelled, check_interval=self.cancel_poll_interval
+                ) as connection:
+                    base_df = self.get_result_cache().get(cache_key) if use_cache else None
+                    if base_df is not None:
+                        st.caption(f"♻️ {label.capitalize()} rows found in the shared result cache")
+                    elif loaded_df is not None and not missing:
+                        base_df = self.slice_range(loaded_df, self.tables[table]['date_column'], start_date, end_date)
                     
-                    st.session_state.onboarding = onboarding_df
-                    st.success(f"✅ Loaded {len(onboarding_df)} onboarding records")
-                else:
-                    st.warning("⚠️ No onboarding records found in the selected date range")
-                    st.session_state.onboarding = pd.DataFrame()
+                    if base_df is not None:
+                        table_df, fetched = self.refresh_window(connection, table, base_df, start_date, end_date)
+                    else:
+                        table_df, fetched = self.load_table_range(connection, table, loaded_df, missing, start_date, end_date)
+            if use_cache:
+                self.get_result_cache().put(cache_key, table_df)
+            return table_df, fetched
+        
+        def on_wait():
+            with container:
+                st.caption(f"⏳ Waiting for another session already loading these {label} rows")
+        
+        (table_df, fetched), shared = self.get_single_flight().do(
+            cache_key, load_window, on_wait,
+            check=self.check_cancelled, check_interval=self.cancel_poll_interval
+        )
+        if shared:
+            return table_df.copy(deep=False), 0
+        return table_df, fetched
+    
+    def load_data_from_db(self, start_date, end_date):
+        """Load data from MySQL database
+        
+        Only the parts of the range that are not already loaded are queried;
+        rows outside the new range are dropped from the loaded frames. A range
+        inside the loaded one is only checked with a watermark probe per
+        table. The Transaction and Onboarding tables are fetched concurrently.
+        """
+        loaded_intervals = st.session_state.loaded_intervals if st.session_state.data_loaded else []
+        if st.session_state.money_scale != self.money_scale():
+            # Loaded amounts use the other money representation
+            loaded_intervals = []
+        missing = self.missing_intervals(start_date, end_date, loaded_intervals)
+        
+        st.session_state.start_date = start_date
+        st.session_state.end_date = end_date
+        st.session_state.window_key = self.window_key(start_date, end_date)
+        
+        try:
+            # Load transactions and onboarding data on separate connections
+            transaction_container = st.container()
+            onboarding_container = st.container()
+            (transactions_df, transactions_fetched), (onboarding_df, onboarding_fetched) = self.run_parallel([
+                lambda: self.load_table(
+                    'Transaction',
+                    st.session_state.loaded_transactions if loaded_intervals else None,
+                    missing, start_date, end_date, transaction_container
+                ),
+                lambda: self.load_table(
+                    'Onboarding',
+                    st.session_state.loaded_onboarding if loaded_intervals else None,
+                    missing, start_date, end_date, onboarding_container
+                )
+            ])
             
-            connection.close()
+            # Keep only the details of transactions still in range
+            details_df = st.session_state.transaction_details
+            if not details_df.empty and not transactions_df.empty:
+                st.session_state.transaction_details = details_df[details_df.index.isin(transactions_df['id'])]
+            else:
+                st.session_state.transaction_details = pd.DataFrame()
+            st.session_state.transaction_export = None
+            
+            st.session_state.loaded_transactions = transactions_df
+            self.set_transactions(transactions_df)
+            if not transactions_df.empty:
+                st.success(f"✅ Loaded {len(transactions_df)} transaction records ({transactions_fetched:,} from MySQL, {len(transactions_df) - transactions_fetched:,} from memory or local cache)")
+            else:
+                st.warning("⚠️ No transaction records found in the selected date range")
+            
+            st.session_state.loaded_onboarding = onboarding_df
+            if not onboarding_df.empty:
+                st.session_state.onboarding = onboarding_df
+                st.success(f"✅ Loaded {len(onboarding_df)} onboarding records ({onboarding_fetched:,} from MySQL, {len(onboarding_df) - onboarding_fetched:,} from memory or local cache)")
+            else:
+                st.warning("⚠️ No onboarding records found in the selected date range")
+                st.session_state.onboarding = pd.DataFrame()
+            
+            st.session_state.column_memory = (
+                self.column_memory_report(transactions_df, 'Transaction')
+                + self.column_memory_report(onboarding_df, 'Onboarding')
+            )
             st.session_state.data_loaded = True
+            st.session_state.money_scale = self.money_scale()
+            st.session_state.loaded_intervals = [(start_date, end_date)]
+            st.session_state.data_as_of = datetime.now()
+            st.session_state.live_tail = None
+            st.session_state.live_rows = []
+            st.session_state.snapshot_metrics = None
             return True
             
+        except MySQLError as e:
+            st.error(f"Database error while loading data: {e}")
+            st.info("Please check your database credentials and connection")
+            return False
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
             import traceback
             st.error(f"Traceback: {traceback.format_exc()}")
             return False
     
+    def fetch_transaction_details(self, ids):
+        """Fetch the wide transaction columns for the given ids on demand
+        
+        Details are cached in session state, so only ids that have not been
+        fetched before cross the wire.
+        """
+        details_df = st.session_state.transaction_details
+        ids = pd.unique(pd.Series(ids).dropna())
+        if not details_df.empty:
+            ids = ids[~pd.Index(ids).isin(details_df.index)]
+        if len(ids) == 0:
+            return details_df
+        
+        connection = self.get_db_connection()
+        if not connection:
+            return details_df
+        
+        # Decode balances the same way as the loaded amounts
+        load_options = self.load_options
+        self.load_options = dict(load_options, exact_money=st.session_state.money_scale > 1)
+        
+        discard = False
+        try:
+            frames = [details_df] if not details_df.empty else []
+            for offset in range(0, len(ids), self.detail_batch_size):
+                batch = [int(value) for value in ids[offset:offset + self.detail_batch_size]]
+                detail_query = f"""
+                    SELECT id, {', '.join(self.transaction_detail_columns)}
+                    FROM Transaction
+                    WHERE id IN ({', '.join(['%s'] * len(batch))})
+                """
+                batch_df = self.fetch_query(
+                    connection, detail_query, batch,
+                    "transaction detail", self.prepare_money
+                )
+                if not batch_df.empty:
+                    frames.append(batch_df.set_index('id'))
+            
+            if frames:
+                details_df = pd.concat(frames)
+                st.session_state.transaction_details = details_df
+        except Exception as e:
+            discard = True
+            st.error(f"Error loading transaction details: {str(e)}")
+        finally:
+            self.load_options = load_options
+            self.release_db_connection(connection, discard=discard)
+        
+        return details_df
+    
+    def with_transaction_details(self, transactions_df):
+        """Return transactions joined with their wide detail columns"""
+        if transactions_df is None or transactions_df.empty or 'id' not in transactions_df.columns:
+            return transactions_df
+        
+        details_df = self.fetch_transaction_details(transactions_df['id'])
+        if details_df.empty:
+            return transactions_df
+        
+        detailed_df = transactions_df.join(details_df, on='id')
+        ordered_columns = [col for col in self.transaction_export_columns if col in detailed_df.columns]
+        extra_columns = [col for col in detailed_df.columns if col not in ordered_columns]
+        return detailed_df[ordered_columns + extra_columns]
+    
+    def create_load_options(self):
+        """Create data loading options"""
+        with st.sidebar.expander("⚙️ Load Options"):
+            self.load_options['streaming'] = st.checkbox(
+                "Streaming ingest",
+                value=True,
+                help="Read rows through an unbuffered server-side cursor in chunks of "
+                     f"{self.fetch_chunk_size:,} rows to keep peak memory bounded"
+            )
+            self.load_options['columnar'] = st.checkbox(
+                "Columnar decode",
+                value=True,
+                help="Decode tuple rows straight into typed column arrays instead of "
+                     "building a dict per row"
+            )
+            self.load_options['aggregate_pushdown'] = st.checkbox(
+                "Snapshot only (SQL aggregates)",
+                value=False,
+                help="Compute the Executive Snapshot with GROUP BY queries inside MySQL "
+                     "without downloading raw rows; detailed panels are skipped"
+            )
+            self.load_options['fetch_strategy'] = st.selectbox(
+                "Fetch strategy",
+                ["Single query", "Range-partitioned", "Keyset pages"],
+                help="Range-partitioned splits long date ranges into sub-ranges fetched "
+                     "concurrently on separate connections. Keyset pages read "
+                     "Transaction in id order, page by page, and resume after a failed page"
+            )
+            if self.load_options['fetch_strategy'] == "Range-partitioned":
+                self.load_options['range_partitions'] = st.slider(
+                    "Parallel range queries",
+                    min_value=2,
+                    max_value=self.max_range_partitions(),
+                    value=self.max_range_partitions(),
+                    help="Capped at half the connection pool, since both tables load at once"
+                )
+            self.load_options['exact_money'] = st.checkbox(
+                "Exact money (minor units)",
+                value=True,
+                help="Decode amount and balance columns into int64 minor units for exact, "
+                     "vectorized sums instead of Decimal objects and floats"
+            )
+            self.load_options['partition_cache'] = st.checkbox(
+                "Local day cache",
+                value=True,
+                help="Keep closed days on disk as one Parquet file per table and day; "
+                     "only today is queried live"
+            )
+            self.load_options['result_cache'] = st.checkbox(
+                "Shared result cache",
+                value=True,
+                help="Reuse windows recently loaded by any session for up to "
+                     f"{self.result_cache_ttl // 60} minutes instead of querying MySQL again"
+            )
+            self.load_options['period_changes'] = st.checkbox(
+                "Period-over-period changes",
+                value=True,
+                help="Compare the snapshot with the previous window of equal length, "
+                     "using hourly rollups that are cached per closed day"
+            )
+            if st.button("🗑️ Clear Local Cache", use_container_width=True):
+                removed = self.clear_partition_cache()
+                self.get_result_cache().clear()
+                st.session_state.period_rollups = None
+                st.success(f"✅ Removed {removed} cached file(s) and the shared result cache")
+        
+        return self.load_options
+    
+    def window_key(self, start_date, end_date):
+        """Stable key of a canonical date window, for caching results across reruns and users"""
+        return f"{start_date:%Y%m%dT%H%M%S}-{end_date:%Y%m%dT%H%M%S}"
+    
     def create_date_filters(self):
         """Create flexible date range filters"""
         st.sidebar.markdown("### 📅 Date Range Selection")
@@ -302,6 +2181,17 @@ class PerformanceDashboard:
         
         today = datetime.now()
         
+        # Windows snap to canonical boundaries so reruns produce the same range:
+        # starts at midnight, closed periods end at the end of their last day and
+        # open periods end at the end of the last closed hour
+        last_closed_hour = today.replace(minute=0, second=0, microsecond=0) - self.range_step
+        
+        def day_start(day):
+            return datetime.combine(day, datetime.min.time())
+        
+        def day_end(day):
+            return datetime.combine(day, datetime.max.time())
+        
         if selected_option == "Custom Range":
             col1, col2 = st.sidebar.columns(2)
             with col1:
@@ -317,16 +2207,16 @@ class PerformanceDashboard:
                     min_value=start_date,
                     max_value=today
                 )
-            start_datetime = datetime.combine(start_date, datetime.min.time())
-            end_datetime = datetime.combine(end_date, datetime.max.time())
+            start_datetime = day_start(start_date)
+            end_datetime = day_end(end_date)
             
         else:
             days = date_options[selected_option]
             
             if days == "month":
                 # This month
-                start_datetime = today.replace(day=1)
-                end_datetime = today
+                start_datetime = day_start(today.date().replace(day=1))
+                end_datetime = last_closed_hour
             elif days == "last_month":
                 # Previous month
                 if today.month == 1:
@@ -334,13 +2224,13 @@ class PerformanceDashboard:
                 else:
                     start_datetime = datetime(today.year, today.month - 1, 1)
                 end_datetime = start_datetime.replace(day=28) + timedelta(days=4)
-                end_datetime = end_datetime - timedelta(days=end_datetime.day)
+                end_datetime = day_end((end_datetime - timedelta(days=end_datetime.day)).date())
             elif days == "quarter":
                 # This quarter
                 current_quarter = (today.month - 1) // 3 + 1
                 start_month = 3 * current_quarter - 2
                 start_datetime = datetime(today.year, start_month, 1)
-                end_datetime = today
+                end_datetime = last_closed_hour
             elif days == "last_quarter":
                 # Previous quarter
                 current_quarter = (today.month - 1) // 3 + 1
@@ -350,19 +2240,22 @@ class PerformanceDashboard:
                 start_datetime = datetime(year, start_month, 1)
                 end_month = start_month + 2
                 end_datetime = datetime(year, end_month, 28) + timedelta(days=4)
-                end_datetime = end_datetime - timedelta(days=end_datetime.day)
+                end_datetime = day_end((end_datetime - timedelta(days=end_datetime.day)).date())
             elif days == "ytd":
                 # Year to date
                 start_datetime = datetime(today.year, 1, 1)
-                end_datetime = today
+                end_datetime = last_closed_hour
             elif days == "last_year":
                 # Last year
                 start_datetime = datetime(today.year - 1, 1, 1)
-                end_datetime = datetime(today.year - 1, 12, 31)
+                end_datetime = day_end(date(today.year - 1, 12, 31))
             else:
                 # Last X days
-                start_datetime = today - timedelta(days=days)
-                end_datetime = today
+                start_datetime = day_start((today - timedelta(days=days)).date())
+                end_datetime = last_closed_hour
+            
+            # Just after midnight on the first day of a period nothing has closed yet
+            end_datetime = max(end_datetime, start_datetime)
         
         return start_datetime, end_datetime
     
@@ -383,35 +2276,171 @@ class PerformanceDashboard:
             if category == 'Airtime Topup':
                 selected_products.append('Airtime Topup')
             else:
-                selected_products.extend(self.product_categories.get(category, []))
-        
-        # Apply product filter to transactions
-        if st.session_state.data_loaded and not st.session_state.transactions.empty:
-            transactions_df = st.session_state.transactions.copy()
-            
-            # Filter by selected products
-            if selected_products:
-                # Create filter for both product_name and service_name
-                product_filter = pd.Series([False] * len(transactions_df))
-                
-                for product in selected_products:
-                    if product == 'Airtime Topup':
-                        if 'service_name' in transactions_df.columns:
-                            product_filter |= (transactions_df['service_name'] == product)
-                    else:
-                        if 'product_name' in transactions_df.columns:
-                            product_filter |= (transactions_df['product_name'] == product)
-                
-                if product_filter.any():
-                    st.session_state.filtered_transactions = transactions_df[product_filter].copy()
-                    st.sidebar.success(f"✅ Filtered to {len(st.session_state.filtered_transactions):,} transactions")
-                else:
-                    st.session_state.filtered_transactions = transactions_df
-            else:
-                st.session_state.filtered_transactions = transactions_df
+                selected_products.extend(self.product_categories.get(category, []))
+        st.session_state.selected_products = selected_products
+        
+        # Apply product filter to transactions
+        if st.session_state.data_loaded:
+            self.apply_product_filter()
+            if st.session_state.product_filter is not None:
+                st.sidebar.success(f"✅ Filtered to {st.session_state.product_filter['count']:,} transactions")
         
         return selected_products if selected_products else self.all_products
     
+    def set_transactions(self, transactions_df):
+        """Replace the transactions in view and filter them by the selected products"""
+        st.session_state.transactions = transactions_df
+        st.session_state.data_version += 1
+        self.apply_product_filter()
+    
+    def apply_product_filter(self):
+        """Record which loaded transactions belong to the selected products
+        
+        The matches are kept as a bitmap over the loaded frame (one bit per
+        row) with their count; None means every row. Like before, a selection
+        that matches nothing leaves the transactions unfiltered. Bitmaps are
+        memoized per selection until the data version changes, so toggling
+        back to a recent selection costs a dictionary lookup. Nothing is
+        recomputed when neither the data nor the selection changed.
+        """
+        transactions_df = st.session_state.transactions
+        selected_products = st.session_state.selected_products
+        fingerprint = (st.session_state.data_version, tuple(selected_products))
+        if fingerprint == st.session_state.filter_fingerprint:
+            # Same data and selection as the last run
+            return
+        st.session_state.filter_fingerprint = fingerprint
+        
+        st.session_state.product_filter = None
+        st.session_state.filter_unmatched = False
+        if transactions_df is None or transactions_df.empty or not selected_products:
+            return
+        
+        memo = st.session_state.selection_memo
+        if memo['version'] != st.session_state.data_version:
+            memo['version'] = st.session_state.data_version
+            memo['entries'].clear()
+        
+        selection = frozenset(selected_products)
+        if selection in memo['entries']:
+            memo['entries'].move_to_end(selection)
+        else:
+            mask = self.product_mask(transactions_df, selected_products)
+            count = int(np.count_nonzero(mask))
+            product_filter = None
+            if 0 < count < len(mask):
+                product_filter = {'bits': np.packbits(mask), 'count': count}
+            memo['entries'][selection] = (product_filter, count == 0)
+            while len(memo['entries']) > self.selection_memo_size:
+                memo['entries'].popitem(last=False)
+        st.session_state.product_filter, st.session_state.filter_unmatched = memo['entries'][selection]
+    
+    def filter_positions(self, rows=None):
+        """Row positions of the selected products, unpacked from the filter bitmap
+        
+        With rows, the bitmap is only unpacked block by block until that many
+        matches are found.
+        """
+        bits = st.session_state.product_filter['bits']
+        total_rows = len(st.session_state.transactions)
+        if rows is None:
+            return np.flatnonzero(np.unpackbits(bits, count=total_rows))
+        
+        block = 1 << 16  # bytes, 8 rows each
+        pieces = []
+        found = 0
+        for offset in range(0, len(bits), block):
+            block_bits = np.unpackbits(bits[offset:offset + block], count=min(block * 8, total_rows - offset * 8))
+            pieces.append(np.flatnonzero(block_bits) + offset * 8)
+            found += len(pieces[-1])
+            if found >= rows:
+                break
+        return np.concatenate(pieces)[:rows]
+    
+    def filtered_transactions(self, rows=None):
+        """Transactions of the selected products, or just their first rows
+        
+        Unfiltered data is the loaded frame itself; a filtered subset is taken
+        at most once per script run and never stored in session state.
+        """
+        transactions_df = st.session_state.transactions
+        if st.session_state.product_filter is None or transactions_df is None:
+            return transactions_df if rows is None else transactions_df.head(rows)
+        if rows is not None:
+            return transactions_df.take(self.filter_positions(rows))
+        
+        fingerprint = self.analysis_fingerprint()
+        if self.analysis_frame is None or self.analysis_frame[0] != fingerprint:
+            self.analysis_frame = (fingerprint, transactions_df.take(self.filter_positions()))
+        return self.analysis_frame[1]
+    
+    def analysis_fingerprint(self):
+        """Fingerprint of everything the analysis panels depend on"""
+        return (
+            st.session_state.data_version,
+            st.session_state.window_key,
+            tuple(st.session_state.selected_products),
+            st.session_state.money_scale
+        )
+    
+    def memoized(self, name, calculate):
+        """Return the result of calculate, reusing the last one while the analysis fingerprint is unchanged"""
+        fingerprint = self.analysis_fingerprint()
+        entry = st.session_state.analysis_memo.get(name)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+        result = calculate()
+        st.session_state.analysis_memo[name] = (fingerprint, result)
+        return result
+    
+    def filtered_transaction_count(self):
+        """Number of transactions of the selected products"""
+        if st.session_state.product_filter is not None:
+            return st.session_state.product_filter['count']
+        transactions_df = st.session_state.transactions
+        return 0 if transactions_df is None else len(transactions_df)
+    
+    def selection_lut(self, selected_products):
+        """Lookup table from product key to whether the key belongs to the selection
+        
+        Services (Airtime Topup) match every key of their service slot, all
+        other products every key of their product slot.
+        """
+        lut = np.zeros((len(self.key_products) + 1) * self.key_service_slots, dtype=bool)
+        for product in selected_products:
+            if product in self.services:
+                lut[self.services.index(product) + 1::self.key_service_slots] = True
+            elif product in self.key_products:
+                slot = self.key_products.index(product)
+                lut[slot * self.key_service_slots:(slot + 1) * self.key_service_slots] = True
+        return lut
+    
+    def product_mask(self, transactions_df, selected_products):
+        """Boolean mask of the transactions that belong to the selected products, in one lookup pass"""
+        if 'product_key' in transactions_df.columns:
+            keys = transactions_df['product_key'].to_numpy()
+        else:
+            keys = self.product_keys(transactions_df)
+        return self.selection_lut(selected_products)[keys]
+    
+    def create_live_options(self):
+        """Create live tail options; returns the refresh interval in seconds, or None when off"""
+        live_mode = st.sidebar.checkbox(
+            "🔴 Live tail (today)",
+            key="live_mode",
+            help="Poll MySQL for new transactions and append them to the loaded data; "
+                 "the live panel updates without reloading the page"
+        )
+        if not live_mode:
+            return None
+        return st.sidebar.select_slider(
+            "Refresh every",
+            options=self.live_intervals,
+            value=30,
+            format_func=lambda seconds: f"{seconds}s",
+            key="live_interval"
+        )
+    
     def create_metric_card(self, title, value, change=None, format_func=None):
         """Create a metric card with optional change indicator"""
         if value is None:
@@ -461,6 +2490,7 @@ class PerformanceDashboard:
                 'new_customers_registered': 0,
                 'new_customers_temporary': 0,
                 'new_customers_total': 0,
+                'new_customer_registrations': 0,
                 'active_customers': 0,
                 'total_transactions': 0,
                 'transaction_value': 0,
@@ -471,8 +2501,8 @@ class PerformanceDashboard:
             })
             return metrics
         
-        # Filter data for the period - use already filtered transactions
-        period_transactions = transactions_df.copy()
+        # Filter data for the period - use already filtered transactions (read only)
+        period_transactions = transactions_df
         
         # Filter onboarding for the period
         if onboarding_df is not None and not onboarding_df.empty and 'registration_date' in onboarding_df.columns:
@@ -496,123 +2526,490 @@ class PerformanceDashboard:
                 metrics['new_customers_registered'] = status_counts.get('Registered', 0)
                 metrics['new_customers_temporary'] = status_counts.get('TemporaryRegister', 0)
                 metrics['new_customers_total'] = customer_onboarding['account_id'].nunique()
+                metrics['new_customer_registrations'] = len(customer_onboarding)
             except Exception as e:
                 metrics['new_customers_active'] = 0
                 metrics['new_customers_registered'] = 0
                 metrics['new_customers_temporary'] = 0
                 metrics['new_customers_total'] = 0
+                metrics['new_customer_registrations'] = 0
         else:
             metrics['new_customers_active'] = 0
             metrics['new_customers_registered'] = 0
             metrics['new_customers_temporary'] = 0
             metrics['new_customers_total'] = 0
+            metrics['new_customer_registrations'] = 0
         
-        # Active Customers (customers with successful transactions)
-        if not period_transactions.empty and 'status' in period_transactions.columns and 'entity_name' in period_transactions.columns:
-            try:
-                customer_transactions = period_transactions[
-                    (period_transactions['entity_name'] == 'Customer') &
-                    (period_transactions['status'] == 'SUCCESS')
-                ]
-                
-                if not customer_transactions.empty and 'user_identifier' in customer_transactions.columns:
-                    user_transaction_counts = customer_transactions.groupby('user_identifier').size()
-                    active_customers = user_transaction_counts[user_transaction_counts >= 2].index.tolist()
-                    metrics['active_customers'] = len(active_customers)
-                else:
-                    metrics['active_customers'] = 0
-            except Exception as e:
-                metrics['active_customers'] = 0
+        # Transaction KPIs in one pass over the coded columns
+        metrics.update(self.calculate_transaction_kpis(period_transactions))
+        
+        # Average Transaction Value
+        if metrics.get('total_transactions', 0) > 0 and metrics.get('transaction_value', 0) > 0:
+            metrics['avg_transaction_value'] = metrics['transaction_value'] / metrics['total_transactions']
         else:
-            metrics['active_customers'] = 0
+            metrics['avg_transaction_value'] = 0
         
-        # Transaction Volume and Value
-        if not period_transactions.empty and 'status' in period_transactions.columns:
-            try:
-                successful_transactions = period_transactions[period_transactions['status'] == 'SUCCESS']
-                metrics['total_transactions'] = len(successful_transactions)
-                
-                if 'amount' in successful_transactions.columns:
-                    metrics['transaction_value'] = successful_transactions['amount'].sum()
-                else:
-                    metrics['transaction_value'] = 0
-            except Exception as e:
-                metrics['total_transactions'] = 0
-                metrics['transaction_value'] = 0
+        return metrics
+    
+    def calculate_previous_snapshot(self, rollups, selected_products):
+        """Snapshot metrics of the previous window, summed from its hourly rollups
+        
+        Only additive metrics can be rebuilt from rollups; active customers
+        and the top product have no previous value. Status counts are row
+        counts, like value_counts in the current window. Distinct accounts
+        cannot be summed across hours, so New Customers is compared through
+        the number of customer registration rows in both windows instead.
+        """
+        transaction_rollups = rollups['Transaction']
+        if selected_products and not transaction_rollups.empty:
+            transaction_rollups = transaction_rollups[self.product_mask(transaction_rollups, selected_products)]
+        
+        all_transactions = transaction_rollups['all_transactions'].sum()
+        previous = {
+            'start_date': rollups['start_date'],
+            'end_date': rollups['end_date'],
+            'total_transactions': transaction_rollups['total_transactions'].sum(),
+            'transaction_value': transaction_rollups['transaction_value'].sum()
+        }
+        previous['success_rate'] = previous['total_transactions'] / all_transactions * 100 if all_transactions > 0 else 0
+        if previous['total_transactions'] > 0 and previous['transaction_value'] > 0:
+            previous['avg_transaction_value'] = previous['transaction_value'] / previous['total_transactions']
         else:
-            metrics['total_transactions'] = 0
-            metrics['transaction_value'] = 0
+            previous['avg_transaction_value'] = 0
+        
+        status_counts = rollups['Onboarding'].groupby('status')['registrations'].sum()
+        previous['new_customers_active'] = status_counts.get('Active', 0)
+        previous['new_customers_registered'] = status_counts.get('Registered', 0)
+        previous['new_customers_temporary'] = status_counts.get('TemporaryRegister', 0)
+        previous['new_customer_registrations'] = status_counts.sum()
+        return previous
+    
+    def previous_snapshot(self, selected_products):
+        """Snapshot metrics of the previous window of equal length, or None when switched off or unavailable
         
-        # Top Product
-        if not period_transactions.empty and 'status' in period_transactions.columns and 'entity_name' in period_transactions.columns:
-            try:
-                # Get all product names (including services)
-                product_counts_dict = {}
-                
-                # Count regular products
-                if 'product_name' in period_transactions.columns:
-                    product_counts = period_transactions[
-                        (period_transactions['status'] == 'SUCCESS') &
-                        (period_transactions['entity_name'] == 'Customer')
-                    ]['product_name'].value_counts()
-                    
-                    for product, count in product_counts.items():
-                        product_counts_dict[product] = count
-                
-                # Count services
-                if 'service_name' in period_transactions.columns:
-                    service_counts = period_transactions[
-                        (period_transactions['status'] == 'SUCCESS') &
-                        (period_transactions['entity_name'] == 'Customer') &
-                        (period_transactions['service_name'].notna())
-                    ]['service_name'].value_counts()
-                    
-                    for service, count in service_counts.items():
-                        product_counts_dict[service] = count
-                
-                if product_counts_dict:
-                    top_product = max(product_counts_dict, key=product_counts_dict.get)
-                    metrics['top_product'] = str(top_product)
-                    metrics['top_product_count'] = product_counts_dict[top_product]
-                else:
-                    metrics['top_product'] = 'N/A'
-                    metrics['top_product_count'] = 0
-            except Exception as e:
-                metrics['top_product'] = 'N/A'
-                metrics['top_product_count'] = 0
+        A selection that matches no loaded transaction leaves the current
+        window unfiltered, so it has no comparable previous window either.
+        """
+        if not self.load_options.get('period_changes', True) or st.session_state.start_date is None:
+            return None
+        if st.session_state.filter_unmatched:
+            return None
+        rollups = self.period_rollups(st.session_state.start_date, st.session_state.end_date)
+        if rollups is None:
+            return None
+        return self.memoized('previous_snapshot', lambda: self.calculate_previous_snapshot(rollups, selected_products))
+    
+    def period_change(self, metrics, previous, key):
+        """Percentage change of one metric against the previous window, or None"""
+        if previous is None or key not in previous:
+            return None
+        before = previous[key]
+        if not before:
+            return None
+        return (float(metrics.get(key, 0) or 0) - float(before)) / float(before) * 100
+    
+    def coded(self, series, value):
+        """Integer codes of a column, its categories and the code of one value (-2 when absent)
+        
+        Categorical columns expose their codes directly; other columns are
+        factorized once. Missing values have code -1.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            categories = series.cat.categories
         else:
-            metrics['top_product'] = 'N/A'
-            metrics['top_product_count'] = 0
+            codes, categories = pd.factorize(series, use_na_sentinel=True)
+        position = categories.get_indexer([value])[0] if len(categories) else -1
+        return codes, categories, (position if position >= 0 else -2)
+    
+    def calculate_transaction_kpis(self, transactions_df):
+        """Compute the transaction KPIs of the executive snapshot in one fused pass
+        
+        The SUCCESS and Customer masks are built once from the integer codes
+        of the categorical columns (and the user_key hashes), and every KPI
+        is derived from them with counts, bincounts over codes and one masked
+        sum, instead of re-filtering the frame per KPI.
+        """
+        kpis = {
+            'active_customers': 0,
+            'total_transactions': 0,
+            'transaction_value': 0,
+            'top_product': 'N/A',
+            'top_product_count': 0,
+            'success_rate': 0
+        }
+        if transactions_df is None or transactions_df.empty or 'status' not in transactions_df.columns:
+            return kpis
+        
+        status_codes, _, success_code = self.coded(transactions_df['status'], 'SUCCESS')
+        success = status_codes == success_code
+        successful_count = int(np.count_nonzero(success))
+        
+        # Transaction Volume and Value
+        kpis['total_transactions'] = successful_count
+        if 'amount' in transactions_df.columns:
+            amounts = transactions_df['amount']
+            if pd.api.types.is_integer_dtype(amounts):
+                # Summed in exact minor units when loaded that way
+                value = int(amounts.to_numpy(dtype=np.int64, na_value=0)[success].sum())
+            else:
+                value = float(np.nansum(amounts.to_numpy(dtype=np.float64, na_value=np.nan)[success]))
+            kpis['transaction_value'] = self.to_major(value)
         
         # Success Rate
-        if not period_transactions.empty and 'status' in period_transactions.columns:
-            try:
-                total_transactions = len(period_transactions)
-                successful_count = len(period_transactions[period_transactions['status'] == 'SUCCESS'])
-                metrics['success_rate'] = (successful_count / total_transactions * 100) if total_transactions > 0 else 0
-            except:
-                metrics['success_rate'] = 0
+        kpis['success_rate'] = successful_count / len(transactions_df) * 100
+        
+        if 'entity_name' not in transactions_df.columns:
+            return kpis
+        entity_codes, _, customer_code = self.coded(transactions_df['entity_name'], 'Customer')
+        customer_success = success & (entity_codes == customer_code)
+        
+        # Active Customers (customers with at least two successful transactions)
+        if 'user_key' in transactions_df.columns:
+            user_keys = transactions_df['user_key'].to_numpy()[customer_success]
+            _, user_counts = np.unique(user_keys[user_keys != 0], return_counts=True)
+            kpis['active_customers'] = int(np.count_nonzero(user_counts >= 2))
+        elif 'user_identifier' in transactions_df.columns:
+            user_codes, _, _ = self.coded(transactions_df['user_identifier'], None)
+            user_codes = user_codes[customer_success]
+            user_counts = np.bincount(user_codes[user_codes >= 0])
+            kpis['active_customers'] = int(np.count_nonzero(user_counts >= 2))
+        
+        # Top Product (services count under their own name)
+        product_counts = {}
+        for col, present_only in (('product_name', False), ('service_name', True)):
+            if col not in transactions_df.columns:
+                continue
+            codes, categories, _ = self.coded(transactions_df[col], None)
+            codes = codes[customer_success]
+            counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+            for position in np.argsort(-counts, kind='stable'):
+                if counts[position] == 0:
+                    break
+                product_counts[categories[position]] = int(counts[position])
+        if product_counts:
+            top_product = max(product_counts, key=product_counts.get)
+            kpis['top_product'] = str(top_product)
+            kpis['top_product_count'] = product_counts[top_product]
+        return kpis
+    
+    def product_filter_clause(self, selected_products):
+        """Build a SQL condition matching the product filter of create_product_filters"""
+        if not selected_products:
+            return "", []
+        
+        conditions = []
+        params = []
+        products = [product for product in selected_products if product != 'Airtime Topup']
+        if products:
+            conditions.append(f"TRIM(product_name) IN ({', '.join(['%s'] * len(products))})")
+            params.extend(products)
+        if 'Airtime Topup' in selected_products:
+            conditions.append("TRIM(service_name) = %s")
+            params.append('Airtime Topup')
+        
+        return f" AND ({' OR '.join(conditions)})", params
+    
+    def calculate_executive_snapshot_sql(self, connection, start_date, end_date, selected_products):
+        """Calculate executive snapshot metrics with aggregate queries run inside MySQL
+        
+        Mirrors calculate_executive_snapshot, but only one small row set per
+        KPI crosses the wire instead of the raw Transaction rows.
+        """
+        metrics = {}
+        product_clause, product_params = self.product_filter_clause(selected_products)
+        range_params = [start_date, end_date]
+        
+        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            # New Customers by Status
+            cursor.execute("""
+                SELECT 
+                    COUNT(DISTINCT account_id) AS new_customers_total,
+                    COUNT(*) AS new_customer_registrations,
+                    COALESCE(SUM(TRIM(status) = 'Active'), 0) AS new_customers_active,
+                    COALESCE(SUM(TRIM(status) = 'Registered'), 0) AS new_customers_registered,
+                    COALESCE(SUM(TRIM(status) = 'TemporaryRegister'), 0) AS new_customers_temporary
+                FROM Onboarding
+                WHERE registration_date BETWEEN %s AND %s
+                    AND TRIM(entity) = 'Customer'
+            """, range_params)
+            row = cursor.fetchone() or {}
+            for key in ('new_customers_total', 'new_customer_registrations', 'new_customers_active',
+                        'new_customers_registered', 'new_customers_temporary'):
+                metrics[key] = int(row.get(key) or 0)
+            
+            # Transaction Volume, Value and Success Rate
+            cursor.execute(f"""
+                SELECT 
+                    COUNT(*) AS all_transactions,
+                    COALESCE(SUM(TRIM(status) = 'SUCCESS'), 0) AS total_transactions,
+                    COALESCE(SUM(CASE WHEN TRIM(status) = 'SUCCESS' THEN amount END), 0) AS transaction_value
+                FROM Transaction
+                WHERE created_at BETWEEN %s AND %s{product_clause}
+            """, range_params + product_params)
+            row = cursor.fetchone() or {}
+            all_transactions = int(row.get('all_transactions') or 0)
+            metrics['total_transactions'] = int(row.get('total_transactions') or 0)
+            metrics['transaction_value'] = float(row.get('transaction_value') or 0)
+            metrics['success_rate'] = (metrics['total_transactions'] / all_transactions * 100) if all_transactions > 0 else 0
+            
+            # Active Customers (at least 2 successful transactions)
+            cursor.execute(f"""
+                SELECT COUNT(*) AS active_customers
+                FROM (
+                    SELECT TRIM(user_identifier) AS user_identifier
+                    FROM Transaction
+                    WHERE created_at BETWEEN %s AND %s
+                        AND TRIM(status) = 'SUCCESS'
+                        AND TRIM(entity_name) = 'Customer'{product_clause}
+                    GROUP BY TRIM(user_identifier)
+                    HAVING COUNT(*) >= 2
+                ) AS active
+            """, range_params + product_params)
+            row = cursor.fetchone() or {}
+            metrics['active_customers'] = int(row.get('active_customers') or 0)
+            
+            # Top Product (services override products of the same name)
+            cursor.execute(f"""
+                SELECT 'product' AS source, TRIM(product_name) AS name, COUNT(*) AS transactions
+                FROM Transaction
+                WHERE created_at BETWEEN %s AND %s
+                    AND TRIM(status) = 'SUCCESS'
+                    AND TRIM(entity_name) = 'Customer'{product_clause}
+                GROUP BY TRIM(product_name)
+                UNION ALL
+                SELECT 'service' AS source, TRIM(service_name) AS name, COUNT(*) AS transactions
+                FROM Transaction
+                WHERE created_at BETWEEN %s AND %s
+                    AND TRIM(status) = 'SUCCESS'
+                    AND TRIM(entity_name) = 'Customer'
+                    AND service_name IS NOT NULL{product_clause}
+                GROUP BY TRIM(service_name)
+            """, (range_params + product_params) * 2)
+            rows = cursor.fetchall()
+        
+        product_counts_dict = {}
+        for source in ('product', 'service'):
+            for row in rows:
+                if row['source'] == source and row['name'] is not None:
+                    product_counts_dict[row['name']] = int(row['transactions'])
+        
+        if product_counts_dict:
+            top_product = max(product_counts_dict, key=product_counts_dict.get)
+            metrics['top_product'] = str(top_product)
+            metrics['top_product_count'] = product_counts_dict[top_product]
         else:
-            metrics['success_rate'] = 0
+            metrics['top_product'] = 'N/A'
+            metrics['top_product_count'] = 0
         
         # Average Transaction Value
-        if metrics.get('total_transactions', 0) > 0 and metrics.get('transaction_value', 0) > 0:
+        if metrics['total_transactions'] > 0 and metrics['transaction_value'] > 0:
             metrics['avg_transaction_value'] = metrics['transaction_value'] / metrics['total_transactions']
         else:
             metrics['avg_transaction_value'] = 0
         
         return metrics
     
-    def display_executive_snapshot(self, metrics):
-        """Display executive snapshot metrics"""
+    def load_snapshot_from_db(self, start_date, end_date, selected_products):
+        """Load only the executive snapshot, aggregated inside MySQL"""
+        st.session_state.start_date = start_date
+        st.session_state.end_date = end_date
+        st.session_state.window_key = self.window_key(start_date, end_date)
+        
+        connection = self.get_db_connection()
+        if not connection:
+            return False
+        
+        def snapshot_task():
+            with self.cancellable(connection):
+                return self.calculate_executive_snapshot_sql(connection, start_date, end_date, selected_products)
+        
+        discard = False
+        try:
+            started = time.perf_counter()
+            # Run in a worker so a superseded run can cancel the aggregates
+            metrics = self.run_parallel([snapshot_task])[0]
+            elapsed = time.perf_counter() - started
+            
+            # Raw frames are not needed in snapshot-only mode
+            self.set_transactions(pd.DataFrame())
+            st.session_state.onboarding = pd.DataFrame()
+            st.session_state.loaded_transactions = pd.DataFrame()
+            st.session_state.loaded_onboarding = pd.DataFrame()
+            st.session_state.transaction_details = pd.DataFrame()
+            st.session_state.transaction_export = None
+            st.session_state.data_loaded = False
+            st.session_state.loaded_intervals = []
+            st.session_state.snapshot_metrics = {
+                'metrics': metrics,
+                'products': list(selected_products)
+            }
+            st.success(f"✅ Snapshot aggregated in MySQL in {elapsed:.1f}s")
+            return True
+            
+        except Exception as e:
+            discard = True
+            st.error(f"Error loading snapshot: {str(e)}")
+            return False
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            self.release_db_connection(connection, discard=discard)
+    
+    def new_live_tail(self):
+        """Start the live accumulators from today's transactions
+        
+        Today's rows in view and the polled rows not merged yet are scanned
+        once; polls then fold in rows past the highest id among them, so
+        every row is counted exactly once.
+        """
+        loaded_df = st.session_state.loaded_transactions
+        live_rows = st.session_state.live_rows
+        ids = [int(df['id'].max()) for df in [loaded_df] + live_rows if not df.empty]
+        live_tail = {
+            'day': date.today(),
+            'products': list(st.session_state.selected_products),
+            'last_id': max(ids, default=0),
+            'polled_at': None,
+            'new_rows': 0,
+            'transactions': 0,
+            'successful': 0,
+            'value': 0,
+            'users': set(),
+            'hourly_count': np.zeros(24, dtype=np.int64),
+            'hourly_value': np.zeros(24, dtype=np.float64)
+        }
+        today_start = datetime.combine(live_tail['day'], datetime.min.time())
+        transactions_df = st.session_state.transactions
+        if transactions_df is not None and not transactions_df.empty:
+            first_today = transactions_df['created_at'].searchsorted(pd.Timestamp(today_start), side='left')
+            self.accumulate_live(live_tail, transactions_df.iloc[first_today:])
+        for batch_df in live_rows:
+            self.accumulate_live(live_tail, batch_df[batch_df['created_at'] >= today_start])
+        return live_tail
+    
+    def accumulate_live(self, live_tail, batch_df):
+        """Fold a batch of new transactions into the live KPI accumulators"""
+        if batch_df.empty:
+            return
+        if live_tail['products']:
+            batch_df = batch_df[self.product_mask(batch_df, live_tail['products'])]
+        
+        success = (batch_df['status'] == 'SUCCESS').to_numpy()
+        successful_df = batch_df[success]
+        amounts = successful_df['amount'].fillna(0)
+        hours = successful_df['created_at'].dt.hour.to_numpy()
+        
+        live_tail['transactions'] += len(batch_df)
+        live_tail['successful'] += len(successful_df)
+        live_tail['value'] += amounts.sum()
+        live_tail['users'].update(successful_df['user_identifier'].dropna().unique())
+        np.add.at(live_tail['hourly_count'], hours, 1)
+        np.add.at(live_tail['hourly_value'], hours, amounts.to_numpy(dtype=np.float64))
+    
+    def poll_new_transactions(self, since, last_id):
+        """Fetch the transactions created from since onwards and added past last_id
+        
+        Each poll is one indexed `id > last_id` query that returns only the
+        new rows. They are queued for merge_live_rows instead of being
+        concatenated onto the loaded frame here.
+        """
+        with self.get_connection_pool().connection() as connection:
+            progress = st.empty()
+            new_df = self.fetch_query(
+                connection, self.transaction_live_query,
+                (since, last_id), 'transaction', self.prepare_transactions, progress=progress
+            )
+            progress.empty()
+        if not new_df.empty:
+            st.session_state.live_rows.append(new_df)
+        return new_df
+    
+    def display_live_tail(self, live_interval):
+        """Poll for new transactions and show today's KPIs, updated incrementally"""
+        st.markdown('<div class="sub-header">🔴 Live Today</div>', unsafe_allow_html=True)
+        if st.session_state.money_scale != self.money_scale():
+            st.markdown('<div class="warning-box">⚠️ Money options changed since the data was loaded. Click \'Load Data\' to resume the live tail.</div>', unsafe_allow_html=True)
+            return
+        
+        live_tail = st.session_state.live_tail
+        if (live_tail is None or live_tail['day'] != date.today()
+                or live_tail['products'] != st.session_state.selected_products):
+            live_tail = self.new_live_tail()
+            st.session_state.live_tail = live_tail
+        
+        try:
+            today_start = datetime.combine(live_tail['day'], datetime.min.time())
+            new_df = self.poll_new_transactions(today_start, live_tail['last_id'])
+            live_tail['polled_at'] = datetime.now()
+        except MySQLError as e:
+            st.warning(f"⚠️ Live poll failed, retrying on the next refresh: {e}")
+            new_df = pd.DataFrame()
+        if not new_df.empty:
+            live_tail['last_id'] = int(new_df['id'].max())
+            self.accumulate_live(live_tail, new_df[new_df['created_at'].dt.date == live_tail['day']])
+        live_tail['new_rows'] = len(new_df)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(self.create_metric_card("Transactions Today", live_tail['transactions']), unsafe_allow_html=True)
+        with col2:
+            st.markdown(self.create_metric_card("Successful Today", live_tail['successful']), unsafe_allow_html=True)
+        with col3:
+            st.markdown(self.create_metric_card(
+                "Value Today",
+                self.to_major(live_tail['value']),
+                format_func=lambda x: f"₦{x:,.0f}" if x else "₦0"
+            ), unsafe_allow_html=True)
+        with col4:
+            st.markdown(self.create_metric_card("Active Users Today", len(live_tail['users'])), unsafe_allow_html=True)
+        
+        hours = np.arange(24)
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=hours,
+            y=live_tail['hourly_count'],
+            name='Successful Transactions',
+            marker_color='#1E3A8A'
+        ))
+        fig.add_trace(go.Scatter(
+            x=hours,
+            y=self.to_major(pd.Series(live_tail['hourly_value'])),
+            name='Value (₦)',
+            line=dict(color='#F59E0B', width=3),
+            yaxis="y2"
+        ))
+        fig.update_layout(
+            title='Today by Hour',
+            xaxis_title='Hour',
+            yaxis_title='Count',
+            yaxis2=dict(title='Value (₦)', overlaying='y', side='right'),
+            height=350,
+            showlegend=True
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        last_poll = live_tail['polled_at'].strftime('%H:%M:%S') if live_tail['polled_at'] else "failed"
+        st.caption(
+            f"Refreshing every {live_interval}s; last poll {last_poll} brought {live_tail['new_rows']:,} new transaction(s). "
+            "The panels below include them from the next interaction."
+        )
+    
+    def display_executive_snapshot(self, metrics, previous=None):
+        """Display executive snapshot metrics, with changes against the previous window when given"""
         st.markdown('<div class="sub-header">📈 Executive Snapshot</div>', unsafe_allow_html=True)
         
+        def change(key):
+            return self.period_change(metrics, previous, key)
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.markdown(self.create_metric_card(
                 "New Customers",
-                metrics.get('new_customers_total', 0)
+                metrics.get('new_customers_total', 0),
+                change=change('new_customer_registrations')
             ), unsafe_allow_html=True)
         
         with col2:
@@ -624,13 +3021,15 @@ class PerformanceDashboard:
         with col3:
             st.markdown(self.create_metric_card(
                 "Total Transactions",
-                metrics.get('total_transactions', 0)
+                metrics.get('total_transactions', 0),
+                change=change('total_transactions')
             ), unsafe_allow_html=True)
         
         with col4:
             st.markdown(self.create_metric_card(
                 "Transaction Value",
                 metrics.get('transaction_value', 0),
+                change=change('transaction_value'),
                 format_func=lambda x: f"₦{x:,.0f}" if x else "₦0"
             ), unsafe_allow_html=True)
         
@@ -640,19 +3039,22 @@ class PerformanceDashboard:
         with col1:
             st.markdown(self.create_metric_card(
                 "Active Status",
-                metrics.get('new_customers_active', 0)
+                metrics.get('new_customers_active', 0),
+                change=change('new_customers_active')
             ), unsafe_allow_html=True)
         
         with col2:
             st.markdown(self.create_metric_card(
                 "Registered Status",
-                metrics.get('new_customers_registered', 0)
+                metrics.get('new_customers_registered', 0),
+                change=change('new_customers_registered')
             ), unsafe_allow_html=True)
         
         with col3:
             st.markdown(self.create_metric_card(
                 "Temporary Status",
-                metrics.get('new_customers_temporary', 0)
+                metrics.get('new_customers_temporary', 0),
+                change=change('new_customers_temporary')
             ), unsafe_allow_html=True)
         
         with col4:
@@ -671,27 +3073,31 @@ class PerformanceDashboard:
         with col1:
             st.markdown(self.create_metric_card(
                 "Success Rate",
-                f"{metrics.get('success_rate', 0):.1f}%"
+                f"{metrics.get('success_rate', 0):.1f}%",
+                change=change('success_rate')
             ), unsafe_allow_html=True)
         
         with col2:
             st.markdown(self.create_metric_card(
                 "Avg Transaction Value",
-                f"₦{metrics.get('avg_transaction_value', 0):,.0f}"
+                f"₦{metrics.get('avg_transaction_value', 0):,.0f}",
+                change=change('avg_transaction_value')
             ), unsafe_allow_html=True)
-    
-    def display_product_performance(self, transactions_df, selected_products):
-        """Display product performance analysis"""
-        st.markdown('<div class="sub-header">📊 Product Performance</div>', unsafe_allow_html=True)
         
+        if previous is not None:
+            st.caption(
+                f"Changes compare with {previous['start_date'].strftime('%b %d, %Y %H:%M')} to "
+                f"{previous['end_date'].strftime('%b %d, %Y %H:%M')}, the previous window of equal length"
+            )
+    
+    def calculate_product_performance(self, transactions_df, selected_products):
+        """Calculate per-product performance of successful customer transactions"""
         if transactions_df is None or transactions_df.empty:
-            st.markdown('<div class="warning-box">⚠️ No transaction data available for the selected period</div>', unsafe_allow_html=True)
-            return
+            return {'status': 'no_data'}
         
         # Filter successful customer transactions
         if 'status' not in transactions_df.columns or 'entity_name' not in transactions_df.columns:
-            st.error("Required columns (status, entity_name) not found in transaction data")
-            return
+            return {'status': 'missing_columns'}
         
         customer_transactions = transactions_df[
             (transactions_df['entity_name'] == 'Customer') &
@@ -699,8 +3105,7 @@ class PerformanceDashboard:
         ]
         
         if customer_transactions.empty:
-            st.info("No successful customer transactions in the selected period")
-            return
+            return {'status': 'no_customer_transactions'}
         
         # Prepare product performance data
         product_data = []
@@ -735,13 +3140,28 @@ class PerformanceDashboard:
                     'Product': product,
                     'Transactions': len(product_trans),
                     'Unique Users': product_trans['user_identifier'].nunique() if 'user_identifier' in product_trans.columns else 0,
-                    'Total Amount': product_trans['amount'].sum() if 'amount' in product_trans.columns else 0,
-                    'Avg Amount': product_trans['amount'].mean() if 'amount' in product_trans.columns and len(product_trans) > 0 else 0
+                    'Total Amount': self.to_major(product_trans['amount'].sum()) if 'amount' in product_trans.columns else 0,
+                    'Avg Amount': self.to_major(product_trans['amount'].sum() / product_trans['amount'].count()) if 'amount' in product_trans.columns and product_trans['amount'].count() > 0 else 0
                 })
         
-        if product_data:
-            product_df = pd.DataFrame(product_data)
-            
+        return {'status': 'ok', 'products': pd.DataFrame(product_data)}
+    
+    def display_product_performance(self, performance):
+        """Display product performance analysis"""
+        st.markdown('<div class="sub-header">📊 Product Performance</div>', unsafe_allow_html=True)
+        
+        if performance['status'] == 'no_data':
+            st.markdown('<div class="warning-box">⚠️ No transaction data available for the selected period</div>', unsafe_allow_html=True)
+            return
+        if performance['status'] == 'missing_columns':
+            st.error("Required columns (status, entity_name) not found in transaction data")
+            return
+        if performance['status'] == 'no_customer_transactions':
+            st.info("No successful customer transactions in the selected period")
+            return
+        
+        product_df = performance['products']
+        if not product_df.empty:
             # Display in columns
             col1, col2 = st.columns([3, 2])
             
@@ -810,34 +3230,69 @@ class PerformanceDashboard:
         else:
             st.info("No product performance data available for selected filters")
     
-    def display_customer_acquisition(self, onboarding_df):
-        """Display customer acquisition metrics"""
-        st.markdown('<div class="sub-header">👥 Customer Acquisition</div>', unsafe_allow_html=True)
-        
+    def calculate_customer_acquisition(self, onboarding_df):
+        """Calculate customer registration trend, status and KYC breakdowns"""
         if onboarding_df is None or onboarding_df.empty:
-            st.markdown('<div class="warning-box">⚠️ No onboarding data available for the selected period</div>', unsafe_allow_html=True)
-            return
+            return {'status': 'no_data'}
         
         # Check for required columns
         if 'entity' not in onboarding_df.columns:
-            st.error("'entity' column not found in onboarding data")
-            return
+            return {'status': 'missing_entity'}
         
         # Filter for customers only
         customer_onboarding = onboarding_df[onboarding_df['entity'] == 'Customer']
         
         if customer_onboarding.empty:
+            return {'status': 'no_customers'}
+        
+        acquisition = {'status': 'ok', 'total': len(customer_onboarding)}
+        
+        # Registration trend
+        acquisition['daily_registrations'] = None
+        if 'registration_date' in customer_onboarding.columns:
+            registration_dates = pd.to_datetime(customer_onboarding['registration_date'], errors='coerce')
+            acquisition['daily_registrations'] = customer_onboarding.set_index(registration_dates).resample('D').size()
+        
+        # Status distribution
+        acquisition['status_counts'] = None
+        if 'status' in customer_onboarding.columns:
+            status_counts = customer_onboarding['status'].value_counts()
+            acquisition['status_counts'] = status_counts[status_counts > 0]  # Unused categories
+        
+        # KYC Status
+        acquisition['kyc_counts'] = None
+        acquisition['verified_count'] = None
+        if 'kyc_status' in customer_onboarding.columns:
+            kyc_counts = customer_onboarding['kyc_status'].value_counts()
+            acquisition['kyc_counts'] = kyc_counts[kyc_counts > 0]  # Unused categories
+            acquisition['verified_count'] = customer_onboarding[
+                customer_onboarding['kyc_status'].str.upper() == 'VERIFIED'
+            ].shape[0]
+        
+        return acquisition
+    
+    def display_customer_acquisition(self, acquisition):
+        """Display customer acquisition metrics"""
+        st.markdown('<div class="sub-header">👥 Customer Acquisition</div>', unsafe_allow_html=True)
+        
+        if acquisition['status'] == 'no_data':
+            st.markdown('<div class="warning-box">⚠️ No onboarding data available for the selected period</div>', unsafe_allow_html=True)
+            return
+        if acquisition['status'] == 'missing_entity':
+            st.error("'entity' column not found in onboarding data")
+            return
+        if acquisition['status'] == 'no_customers':
             st.info("No customer onboarding data available")
             return
         
+        total_registrations = acquisition['total']
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
             # Registration trend
-            if 'registration_date' in customer_onboarding.columns:
-                customer_onboarding['registration_date'] = pd.to_datetime(customer_onboarding['registration_date'], errors='coerce')
-                daily_registrations = customer_onboarding.set_index('registration_date').resample('D').size()
-                
+            daily_registrations = acquisition['daily_registrations']
+            if daily_registrations is not None:
                 if not daily_registrations.empty:
                     fig = px.line(
                         x=daily_registrations.index,
@@ -854,8 +3309,8 @@ class PerformanceDashboard:
         
         with col2:
             # Status distribution
-            if 'status' in customer_onboarding.columns:
-                status_counts = customer_onboarding['status'].value_counts()
+            status_counts = acquisition['status_counts']
+            if status_counts is not None:
                 if not status_counts.empty:
                     fig = px.pie(
                         values=status_counts.values,
@@ -873,14 +3328,14 @@ class PerformanceDashboard:
         
         with col3:
             # KYC Status
-            if 'kyc_status' in customer_onboarding.columns:
-                kyc_counts = customer_onboarding['kyc_status'].value_counts()
+            kyc_counts = acquisition['kyc_counts']
+            if kyc_counts is not None:
                 if not kyc_counts.empty:
                     st.markdown("**KYC Status**")
                     for status, count in kyc_counts.items():
-                        percentage = (count / len(customer_onboarding)) * 100 if len(customer_onboarding) > 0 else 0
+                        percentage = (count / total_registrations) * 100 if total_registrations > 0 else 0
                         st.progress(
-                            count / len(customer_onboarding) if len(customer_onboarding) > 0 else 0,
+                            count / total_registrations if total_registrations > 0 else 0,
                             text=f"{status}: {count} ({percentage:.1f}%)"
                         )
                 else:
@@ -889,35 +3344,64 @@ class PerformanceDashboard:
                 st.info("KYC status data not available")
             
             # Metrics
-            st.metric("Total Registrations", f"{len(customer_onboarding):,.0f}")
-            if 'kyc_status' in customer_onboarding.columns:
-                verified_count = customer_onboarding[
-                    customer_onboarding['kyc_status'].str.upper() == 'VERIFIED'
-                ].shape[0] if 'kyc_status' in customer_onboarding.columns else 0
-                st.metric("KYC Verified", f"{verified_count:,}")
-    
-    def display_transaction_analysis(self, transactions_df):
-        """Display transaction analysis"""
-        st.markdown('<div class="sub-header">💳 Transaction Analysis</div>', unsafe_allow_html=True)
-        
+            st.metric("Total Registrations", f"{total_registrations:,.0f}")
+            if acquisition['verified_count'] is not None:
+                st.metric("KYC Verified", f"{acquisition['verified_count']:,}")
+    
+    def calculate_transaction_analysis(self, transactions_df):
+        """Calculate daily volume and value, success rate, average value and peak day"""
         if transactions_df is None or transactions_df.empty:
-            st.markdown('<div class="warning-box">⚠️ No transaction data available for the selected period</div>', unsafe_allow_html=True)
-            return
+            return {'status': 'no_data'}
         
         # Check for required columns
         if 'status' not in transactions_df.columns:
-            st.error("'status' column not found in transaction data")
-            return
+            return {'status': 'missing_status'}
         
         # Filter successful transactions
         successful_transactions = transactions_df[transactions_df['status'] == 'SUCCESS']
         
         if successful_transactions.empty:
-            st.info("No successful transactions in the selected period")
-            return
+            return {'status': 'no_successful'}
         
         # Check for date column
         if 'created_at' not in successful_transactions.columns:
+            return {'status': 'missing_created_at'}
+        
+        analysis = {'status': 'ok'}
+        created_at = pd.to_datetime(successful_transactions['created_at'], errors='coerce')
+        by_day = successful_transactions.set_index(created_at).resample('D')
+        
+        # Daily transaction volume and value
+        analysis['daily_transactions'] = by_day.size()
+        analysis['daily_value'] = self.to_major(by_day['amount'].sum()) if 'amount' in successful_transactions.columns else None
+        
+        # Success rate analysis
+        status_counts = transactions_df['status'].value_counts()
+        success_count = status_counts.get('SUCCESS', 0)
+        analysis['success_rate'] = (success_count / len(transactions_df)) * 100 if len(transactions_df) > 0 else 0
+        
+        analysis['avg_transaction_value'] = None
+        if 'amount' in successful_transactions.columns:
+            analysis['avg_transaction_value'] = self.to_major(successful_transactions['amount'].mean())
+        
+        daily_counts = successful_transactions.groupby(created_at.dt.date).size()
+        analysis['peak_day'] = (daily_counts.idxmax(), daily_counts.max()) if not daily_counts.empty else None
+        return analysis
+    
+    def display_transaction_analysis(self, analysis):
+        """Display transaction analysis"""
+        st.markdown('<div class="sub-header">💳 Transaction Analysis</div>', unsafe_allow_html=True)
+        
+        if analysis['status'] == 'no_data':
+            st.markdown('<div class="warning-box">⚠️ No transaction data available for the selected period</div>', unsafe_allow_html=True)
+            return
+        if analysis['status'] == 'missing_status':
+            st.error("'status' column not found in transaction data")
+            return
+        if analysis['status'] == 'no_successful':
+            st.info("No successful transactions in the selected period")
+            return
+        if analysis['status'] == 'missing_created_at':
             st.error("'created_at' column not found in transaction data")
             return
         
@@ -925,8 +3409,7 @@ class PerformanceDashboard:
         
         with col1:
             # Daily transaction volume
-            successful_transactions['created_at'] = pd.to_datetime(successful_transactions['created_at'], errors='coerce')
-            daily_transactions = successful_transactions.set_index('created_at').resample('D').size()
+            daily_transactions = analysis['daily_transactions']
             
             if not daily_transactions.empty:
                 fig = px.line(
@@ -942,9 +3425,8 @@ class PerformanceDashboard:
         
         with col2:
             # Transaction value trend
-            if 'amount' in successful_transactions.columns:
-                daily_value = successful_transactions.set_index('created_at').resample('D')['amount'].sum()
-                
+            daily_value = analysis['daily_value']
+            if daily_value is not None:
                 if not daily_value.empty:
                     fig = px.line(
                         x=daily_value.index,
@@ -964,73 +3446,83 @@ class PerformanceDashboard:
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            if 'status' in transactions_df.columns:
-                status_counts = transactions_df['status'].value_counts()
-                success_count = status_counts.get('SUCCESS', 0)
-                success_rate = (success_count / len(transactions_df)) * 100 if len(transactions_df) > 0 else 0
-                st.metric("Success Rate", f"{success_rate:.1f}%")
-            else:
-                st.metric("Success Rate", "N/A")
+            st.metric("Success Rate", f"{analysis['success_rate']:.1f}%")
         
         with col2:
-            if 'amount' in successful_transactions.columns and not successful_transactions.empty:
-                avg_transaction_value = successful_transactions['amount'].mean()
-                st.metric("Avg Transaction Value", f"₦{avg_transaction_value:,.0f}")
+            if analysis['avg_transaction_value'] is not None:
+                st.metric("Avg Transaction Value", f"₦{analysis['avg_transaction_value']:,.0f}")
             else:
                 st.metric("Avg Transaction Value", "₦0")
         
         with col3:
-            if 'created_at' in successful_transactions.columns and not successful_transactions.empty:
-                successful_transactions['date'] = pd.to_datetime(successful_transactions['created_at']).dt.date
-                daily_counts = successful_transactions.groupby('date').size()
-                if not daily_counts.empty:
-                    peak_date = daily_counts.idxmax()
-                    peak_count = daily_counts.max()
-                    st.metric("Peak Day", f"{peak_date.strftime('%b %d')}: {peak_count:,}")
-                else:
-                    st.metric("Peak Day", "N/A")
+            if analysis['peak_day'] is not None:
+                peak_date, peak_count = analysis['peak_day']
+                st.metric("Peak Day", f"{peak_date.strftime('%b %d')}: {peak_count:,}")
             else:
                 st.metric("Peak Day", "N/A")
     
-    def display_trend_analysis(self, transactions_df, onboarding_df):
-        """Display trend analysis with fixed Plotly layout"""
-        st.markdown('<div class="sub-header">📈 Trend Analysis</div>', unsafe_allow_html=True)
-        
+    def calculate_trend_analysis(self, transactions_df, onboarding_df):
+        """Calculate weekly transaction and registration trends"""
         if (transactions_df is None or transactions_df.empty) and (onboarding_df is None or onboarding_df.empty):
-            st.markdown('<div class="warning-box">⚠️ Insufficient data for trend analysis</div>', unsafe_allow_html=True)
-            return
+            return {'status': 'no_data'}
+        
+        errors = []
         
         # Prepare transactions data
         weekly_transactions = pd.DataFrame()
         if transactions_df is not None and not transactions_df.empty and 'created_at' in transactions_df.columns:
             try:
-                transactions_df['created_at'] = pd.to_datetime(transactions_df['created_at'], errors='coerce')
-                transactions_df['week'] = transactions_df['created_at'].dt.to_period('W').dt.start_time
+                # Week keys are computed on the side; the input frame may be shared
+                created_at = pd.to_datetime(transactions_df['created_at'], errors='coerce')
+                week = created_at.dt.to_period('W').dt.start_time.rename('week')
                 
                 if 'status' in transactions_df.columns:
-                    successful_transactions = transactions_df[transactions_df['status'] == 'SUCCESS']
+                    success_mask = transactions_df['status'] == 'SUCCESS'
+                    successful_transactions = transactions_df[success_mask]
                     if not successful_transactions.empty:
-                        weekly_transactions = successful_transactions.groupby('week').agg({
+                        weekly_transactions = successful_transactions.groupby(week[success_mask]).agg({
                             'amount': 'sum' if 'amount' in successful_transactions.columns else None,
                             'id': 'count' if 'id' in successful_transactions.columns else None
                         })
                         weekly_transactions.columns = ['transaction_value', 'transaction_count']
+                        weekly_transactions['transaction_value'] = self.to_major(weekly_transactions['transaction_value'])
             except Exception as e:
-                st.error(f"Error preparing transaction trends: {e}")
+                errors.append(f"Error preparing transaction trends: {e}")
         
         # Prepare onboarding data
         weekly_registrations = pd.DataFrame()
         if onboarding_df is not None and not onboarding_df.empty and 'registration_date' in onboarding_df.columns:
             try:
-                onboarding_df['registration_date'] = pd.to_datetime(onboarding_df['registration_date'], errors='coerce')
-                onboarding_df['week'] = onboarding_df['registration_date'].dt.to_period('W').dt.start_time
+                registration_date = pd.to_datetime(onboarding_df['registration_date'], errors='coerce')
+                week = registration_date.dt.to_period('W').dt.start_time.rename('week')
                 
                 if 'entity' in onboarding_df.columns:
-                    customer_onboarding = onboarding_df[onboarding_df['entity'] == 'Customer']
+                    customer_mask = onboarding_df['entity'] == 'Customer'
+                    customer_onboarding = onboarding_df[customer_mask]
                     if not customer_onboarding.empty:
-                        weekly_registrations = customer_onboarding.groupby('week').size().reset_index(name='registrations')
+                        weekly_registrations = customer_onboarding.groupby(week[customer_mask]).size().reset_index(name='registrations')
             except Exception as e:
-                st.error(f"Error preparing registration trends: {e}")
+                errors.append(f"Error preparing registration trends: {e}")
+        
+        return {
+            'status': 'ok',
+            'weekly_transactions': weekly_transactions,
+            'weekly_registrations': weekly_registrations,
+            'errors': errors
+        }
+    
+    def display_trend_analysis(self, trends):
+        """Display trend analysis with fixed Plotly layout"""
+        st.markdown('<div class="sub-header">📈 Trend Analysis</div>', unsafe_allow_html=True)
+        
+        if trends['status'] == 'no_data':
+            st.markdown('<div class="warning-box">⚠️ Insufficient data for trend analysis</div>', unsafe_allow_html=True)
+            return
+        
+        for error in trends['errors']:
+            st.error(error)
+        weekly_transactions = trends['weekly_transactions']
+        weekly_registrations = trends['weekly_registrations']
         
         # Create trend visualization
         try:
@@ -1113,6 +3605,9 @@ class PerformanceDashboard:
         # Header
         st.markdown('<div class="main-header">📊 Business Development Performance Dashboard</div>', unsafe_allow_html=True)
         
+        # Rows polled by the live tail since the last full run
+        self.merge_live_rows()
+        
         # Sidebar filters
         with st.sidebar:
             st.markdown("### 🎯 Dashboard Filters")
@@ -1124,19 +3619,36 @@ class PerformanceDashboard:
                 else:
                     st.error("❌ Database connection failed")
             
+            self.display_pool_stats()
+            
             st.markdown("---")
             
             # Date range selection
             start_date, end_date = self.create_date_filters()
             
+            # Ranges inside the loaded data are sliced from memory right away
+            if (st.session_state.data_loaded
+                    and (start_date, end_date) != (st.session_state.start_date, st.session_state.end_date)
+                    and not self.missing_intervals(start_date, end_date, st.session_state.loaded_intervals)):
+                self.slice_loaded_data(start_date, end_date)
+            
             # Product filters - this now filters the data
             selected_products = self.create_product_filters()
             
+            # Ingest options
+            self.create_load_options()
+            
+            # Live tail
+            live_interval = self.create_live_options()
+            
             # Load data button
             st.markdown("---")
             if st.button("🚀 Load Data", type="primary", use_container_width=True, key="load_data"):
                 with st.spinner("Loading data from database..."):
-                    success = self.load_data_from_db(start_date, end_date)
+                    if self.load_options.get('aggregate_pushdown'):
+                        success = self.load_snapshot_from_db(start_date, end_date, st.session_state.selected_products)
+                    else:
+                        success = self.load_data_from_db(start_date, end_date)
                     if success:
                         st.success("✅ Data loaded successfully!")
             
@@ -1146,10 +3658,8 @@ class PerformanceDashboard:
             
             if st.session_state.data_loaded:
                 # Show counts for filtered transactions
-                if st.session_state.filtered_transactions is not None and not st.session_state.filtered_transactions.empty:
-                    st.success(f"✅ Transactions: {len(st.session_state.filtered_transactions):,} records")
-                elif st.session_state.transactions is not None and not st.session_state.transactions.empty:
-                    st.success(f"✅ Transactions: {len(st.session_state.transactions):,} records")
+                if self.filtered_transaction_count():
+                    st.success(f"✅ Transactions: {self.filtered_transaction_count():,} records")
                 else:
                     st.warning("⚠️ No transaction records loaded")
                 
@@ -1157,9 +3667,28 @@ class PerformanceDashboard:
                     st.success(f"✅ Onboarding: {len(st.session_state.onboarding):,} records")
                 else:
                     st.warning("⚠️ No onboarding records loaded")
+                
+                self.display_data_freshness()
+                
+                if st.session_state.column_memory:
+                    with st.expander("🧮 Column Memory"):
+                        memory_df = pd.DataFrame(st.session_state.column_memory)
+                        st.caption(
+                            f"Categorical columns: {memory_df['Categorical MB'].sum():,.1f} MB "
+                            f"instead of {memory_df['Object MB'].sum():,.1f} MB as object strings"
+                        )
+                        st.dataframe(
+                            memory_df.style.format({'Object MB': '{:,.2f}', 'Categorical MB': '{:,.2f}'}),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+            elif st.session_state.snapshot_metrics is not None:
+                st.success("✅ Snapshot aggregates loaded (no raw rows)")
             else:
                 st.info("👈 Click 'Load Data' to begin analysis")
             
+            self.display_result_cache_stats()
+            
             # Date range display
             st.markdown("---")
             st.markdown(f"**Selected Date Range:**")
@@ -1171,44 +3700,65 @@ class PerformanceDashboard:
         # Main content area
         if st.session_state.data_loaded:
             # Check if we have any data
-            has_transactions = st.session_state.filtered_transactions is not None and not st.session_state.filtered_transactions.empty
+            has_transactions = self.filtered_transaction_count() > 0
             has_onboarding = st.session_state.onboarding is not None and not st.session_state.onboarding.empty
             
             if not has_transactions and not has_onboarding:
                 st.markdown('<div class="warning-box">⚠️ No data available for the selected date range. Try selecting a different date range.</div>', unsafe_allow_html=True)
                 return
             
-            # Use filtered transactions for analysis
-            analysis_transactions = st.session_state.filtered_transactions
+            # Live tail of today's transactions, refreshed on its own
+            if live_interval:
+                if st.session_state.end_date >= datetime.combine(date.today(), datetime.min.time()):
+                    st.fragment(run_every=live_interval)(self.display_live_tail)(live_interval)
+                else:
+                    st.markdown('<div class="info-box">ℹ️ Live tail needs a date range that includes today.</div>', unsafe_allow_html=True)
+                st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+            
+            # Aggregates of the filtered transactions are reused until the
+            # data, the window or the product selection changes
+            onboarding_df = st.session_state.onboarding
             
             # Executive Snapshot
-            metrics = self.calculate_executive_snapshot(
+            metrics = self.memoized('executive_snapshot', lambda: self.calculate_executive_snapshot(
                 st.session_state.start_date, st.session_state.end_date,
-                analysis_transactions,
-                st.session_state.onboarding
-            )
-            self.display_executive_snapshot(metrics)
+                self.filtered_transactions(),
+                onboarding_df
+            ))
+            self.display_executive_snapshot(metrics, self.previous_snapshot(st.session_state.selected_products))
             
             st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
             
             # Product Performance
-            self.display_product_performance(analysis_transactions, selected_products)
+            self.display_product_performance(self.memoized(
+                'product_performance',
+                lambda: self.calculate_product_performance(self.filtered_transactions(), selected_products)
+            ))
             
             st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
             
             # Customer Acquisition (only if we have onboarding data)
             if has_onboarding:
-                self.display_customer_acquisition(st.session_state.onboarding)
+                self.display_customer_acquisition(self.memoized(
+                    'customer_acquisition',
+                    lambda: self.calculate_customer_acquisition(onboarding_df)
+                ))
                 st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
             
             # Transaction Analysis (only if we have transaction data)
             if has_transactions:
-                self.display_transaction_analysis(analysis_transactions)
+                self.display_transaction_analysis(self.memoized(
+                    'transaction_analysis',
+                    lambda: self.calculate_transaction_analysis(self.filtered_transactions())
+                ))
                 st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
             
             # Trend Analysis (if we have both datasets)
             if has_transactions or has_onboarding:
-                self.display_trend_analysis(analysis_transactions, st.session_state.onboarding)
+                self.display_trend_analysis(self.memoized(
+                    'trend_analysis',
+                    lambda: self.calculate_trend_analysis(self.filtered_transactions(), onboarding_df)
+                ))
             
             # Export options
             st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
@@ -1218,14 +3768,24 @@ class PerformanceDashboard:
             
             with col1:
                 if has_transactions:
-                    csv_transactions = analysis_transactions.to_csv(index=False)
-                    st.download_button(
-                        label="Download Transaction Data (CSV)",
-                        data=csv_transactions,
-                        file_name=f"transactions_{st.session_state.start_date.strftime('%Y%m%d')}_{st.session_state.end_date.strftime('%Y%m%d')}.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                    )
+                    # Detail columns are only fetched when an export is requested
+                    export_key = self.analysis_fingerprint()
+                    export = st.session_state.transaction_export
+                    if export is None or export[0] != export_key:
+                        if st.button("Prepare Transaction Data (CSV)", use_container_width=True):
+                            with st.spinner("Fetching transaction details..."):
+                                csv_transactions = self.with_major_units(self.without_internal_columns(self.with_transaction_details(self.filtered_transactions()))).to_csv(index=False)
+                            st.session_state.transaction_export = (export_key, csv_transactions)
+                            export = st.session_state.transaction_export
+                    
+                    if export is not None and export[0] == export_key:
+                        st.download_button(
+                            label="Download Transaction Data (CSV)",
+                            data=export[1],
+                            file_name=f"transactions_{st.session_state.start_date.strftime('%Y%m%d')}_{st.session_state.end_date.strftime('%Y%m%d')}.csv",
+                            mime="text/csv",
+                            use_container_width=True
+                        )
                 else:
                     st.info("No transaction data to export")
             
@@ -1248,8 +3808,12 @@ class PerformanceDashboard:
                 
                 with tab1:
                     if has_transactions:
+                        preview_transactions = self.filtered_transactions(rows=100)
+                        if st.checkbox("Include detail columns (remarks, messages, references)", key="preview_details"):
+                            preview_transactions = self.with_transaction_details(preview_transactions)
+                        preview_transactions = self.with_major_units(self.without_internal_columns(preview_transactions))
                         st.dataframe(
-                            analysis_transactions.head(100),
+                            preview_transactions,
                             use_container_width=True,
                             hide_index=True
                         )
@@ -1266,6 +3830,17 @@ class PerformanceDashboard:
                     else:
                         st.info("No onboarding data available")
         
+        elif st.session_state.snapshot_metrics is not None:
+            # Snapshot-only mode: aggregates computed in MySQL, no raw rows
+            self.display_executive_snapshot(
+                st.session_state.snapshot_metrics['metrics'],
+                self.previous_snapshot(st.session_state.snapshot_metrics['products'])
+            )
+            
+            if st.session_state.snapshot_metrics['products'] != st.session_state.selected_products:
+                st.markdown('<div class="warning-box">⚠️ Product filters changed since the snapshot was computed. Click \'Load Data\' to refresh it.</div>', unsafe_allow_html=True)
+            st.markdown('<div class="info-box">ℹ️ Snapshot computed inside MySQL. Turn off \'Snapshot only\' in Load Options and reload to see the detailed panels.</div>', unsafe_allow_html=True)
+        
         else:
             # Welcome/instructions
             st.markdown('<div class="info-box">👋 Welcome to the Business Development Performance Dashboard!</div>', unsafe_allow_html=True)
@@ -0,0 +1,84 @@
+"""Compare dict-per-row and columnar decoding of the Transaction query
+
+Runs the dashboard's Transaction query over the same date range with both
+decode paths and prints wall time, throughput and resulting frame size.
+
+Usage:
+    python benchmarks/bench_decode.py --start 2024-01-01 --end 2024-03-31 --runs 3
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+import pymysql
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from app import PerformanceDashboard  # noqa: E402
+
+
+def fetch(dashboard, start_date, end_date, columnar):
+    """Fetch and prepare the Transaction range with one decode path"""
+    config = dashboard.db_config
+    connection = pymysql.connect(
+        host=config['host'],
+        user=config['user'],
+        password=config['password'],
+        database=config['database'],
+        charset='utf8mb4',
+        connect_timeout=10
+    )
+    try:
+        cursor_class = pymysql.cursors.SSCursor if columnar else pymysql.cursors.SSDictCursor
+        chunks = []
+        started = time.perf_counter()
+        with connection.cursor(cursor_class) as cursor:
+            cursor.execute(dashboard.money_query(dashboard.transaction_query), (start_date, end_date))
+            while True:
+                rows = cursor.fetchmany(dashboard.fetch_chunk_size)
+                if not rows:
+                    break
+                if columnar:
+                    chunk_df = dashboard.decode_columns(rows, cursor.description)
+                else:
+                    chunk_df = pd.DataFrame(rows)
+                chunks.append(dashboard.prepare_transactions(chunk_df))
+        frame = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        return frame, time.perf_counter() - started
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--start', required=True, help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end', required=True, help='End date (YYYY-MM-DD)')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per decode path')
+    args = parser.parse_args()
+
+    start_date = datetime.strptime(args.start, '%Y-%m-%d')
+    end_date = datetime.combine(datetime.strptime(args.end, '%Y-%m-%d'), datetime.max.time())
+    dashboard = PerformanceDashboard()
+
+    results = {}
+    for label, columnar in (('dict rows', False), ('columnar', True)):
+        timings = []
+        for _ in range(args.runs):
+            frame, elapsed = fetch(dashboard, start_date, end_date, columnar)
+            timings.append(elapsed)
+        best = min(timings)
+        results[label] = best
+        memory_mb = frame.memory_usage(deep=True).sum() / 1024 ** 2
+        rate = len(frame) / best if best > 0 else 0
+        print(f"{label:>10}: {len(frame):,} rows, best {best:.2f}s "
+              f"({rate:,.0f} rows/sec), frame {memory_mb:,.1f} MB")
+
+    if results['columnar'] > 0:
+        print(f"speedup: {results['dict rows'] / results['columnar']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Compare the per-KPI and fused computations of the executive snapshot
+
+Builds a synthetic Transaction frame through the dashboard's ingest
+preparation (categorical columns, int64 minor-unit amounts), then times the
+former per-KPI implementation of calculate_executive_snapshot, which copies
+the frame and re-filters it for every KPI, against the fused
+calculate_transaction_kpis. Both must produce the same metrics.
+
+Usage:
+    python benchmarks/bench_snapshot.py --rows 5000000 --runs 3
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from app import PerformanceDashboard  # noqa: E402
+
+
+def build_frame(dashboard, rows, seed):
+    """Build a prepared Transaction frame with realistic cardinalities"""
+    rng = np.random.default_rng(seed)
+    products = dashboard.key_products + ['Other']
+    start = datetime.now() - timedelta(days=90)
+    raw_df = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'user_identifier': pd.Series(rng.integers(0, max(rows // 10, 1), rows)).map(' 22{:07d} '.format),
+        'entity_name': rng.choice(['Customer', 'Agent', 'Merchant'], rows, p=[0.7, 0.2, 0.1]),
+        'status': rng.choice(['SUCCESS', 'FAILED', 'PENDING'], rows, p=[0.85, 0.1, 0.05]),
+        'service_name': rng.choice(np.array(['Airtime Topup', None], dtype=object), rows, p=[0.15, 0.85]),
+        'product_name': rng.choice(products, rows),
+        'transaction_type': rng.choice(['DR', 'CR'], rows),
+        # Amounts arrive from MySQL as integer minor units (see money_query)
+        'amount': rng.integers(100, 500000, rows),
+        'created_at': start + pd.to_timedelta(np.sort(rng.integers(0, 90 * 86400, rows)), unit='s')
+    })
+    return dashboard.prepare_transactions(raw_df)
+
+
+def legacy_transaction_kpis(dashboard, transactions_df):
+    """Transaction KPIs as calculate_executive_snapshot computed them before the fused engine"""
+    metrics = {}
+    period_transactions = transactions_df.copy()
+
+    # Active Customers (customers with successful transactions)
+    if not period_transactions.empty and 'status' in period_transactions.columns and 'entity_name' in period_transactions.columns:
+        try:
+            customer_transactions = period_transactions[
+                (period_transactions['entity_name'] == 'Customer') &
+                (period_transactions['status'] == 'SUCCESS')
+            ]
+
+            if not customer_transactions.empty and 'user_identifier' in customer_transactions.columns:
+                user_transaction_counts = customer_transactions.groupby('user_identifier').size()
+                active_customers = user_transaction_counts[user_transaction_counts >= 2].index.tolist()
+                metrics['active_customers'] = len(active_customers)
+            else:
+                metrics['active_customers'] = 0
+        except Exception as e:
+            metrics['active_customers'] = 0
+    else:
+        metrics['active_customers'] = 0
+
+    # Transaction Volume and Value
+    if not period_transactions.empty and 'status' in period_transactions.columns:
+        try:
+            successful_transactions = period_transactions[period_transactions['status'] == 'SUCCESS']
+            metrics['total_transactions'] = len(successful_transactions)
+
+            if 'amount' in successful_transactions.columns:
+                # Summed in exact minor units when loaded that way
+                metrics['transaction_value'] = dashboard.to_major(successful_transactions['amount'].sum())
+            else:
+                metrics['transaction_value'] = 0
+        except Exception as e:
+            metrics['total_transactions'] = 0
+            metrics['transaction_value'] = 0
+    else:
+        metrics['total_transactions'] = 0
+        metrics['transaction_value'] = 0
+
+    # Top Product
+    if not period_transactions.empty and 'status' in period_transactions.columns and 'entity_name' in period_transactions.columns:
+        try:
+            # Get all product names (including services)
+            product_counts_dict = {}
+
+            # Count regular products
+            if 'product_name' in period_transactions.columns:
+                product_counts = period_transactions[
+                    (period_transactions['status'] == 'SUCCESS') &
+                    (period_transactions['entity_name'] == 'Customer')
+                ]['product_name'].value_counts()
+
+                for product, count in product_counts[product_counts > 0].items():
+                    product_counts_dict[product] = count
+
+            # Count services
+            if 'service_name' in period_transactions.columns:
+                service_counts = period_transactions[
+                    (period_transactions['status'] == 'SUCCESS') &
+                    (period_transactions['entity_name'] == 'Customer') &
+                    (period_transactions['service_name'].notna())
+                ]['service_name'].value_counts()
+
+                for service, count in service_counts[service_counts > 0].items():
+                    product_counts_dict[service] = count
+
+            if product_counts_dict:
+                top_product = max(product_counts_dict, key=product_counts_dict.get)
+                metrics['top_product'] = str(top_product)
+                metrics['top_product_count'] = product_counts_dict[top_product]
+            else:
+                metrics['top_product'] = 'N/A'
+                metrics['top_product_count'] = 0
+        except Exception as e:
+            metrics['top_product'] = 'N/A'
+            metrics['top_product_count'] = 0
+    else:
+        metrics['top_product'] = 'N/A'
+        metrics['top_product_count'] = 0
+
+    # Success Rate
+    if not period_transactions.empty and 'status' in period_transactions.columns:
+        try:
+            total_transactions = len(period_transactions)
+            successful_count = len(period_transactions[period_transactions['status'] == 'SUCCESS'])
+            metrics['success_rate'] = (successful_count / total_transactions * 100) if total_transactions > 0 else 0
+        except:
+            metrics['success_rate'] = 0
+    else:
+        metrics['success_rate'] = 0
+
+    return metrics
+
+
+def best_of(runs, func):
+    """Best wall time of several runs of func and its last result"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5_000_000, help='Rows in the synthetic frame')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per implementation')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed')
+    args = parser.parse_args()
+
+    dashboard = PerformanceDashboard()
+    started = time.perf_counter()
+    transactions_df = build_frame(dashboard, args.rows, args.seed)
+    print(f"built {len(transactions_df):,} rows in {time.perf_counter() - started:.1f}s, "
+          f"{transactions_df.memory_usage(deep=True).sum() / 1024 ** 2:,.0f} MB")
+
+    legacy_time, legacy = best_of(args.runs, lambda: legacy_transaction_kpis(dashboard, transactions_df))
+    fused_time, fused = best_of(args.runs, lambda: dashboard.calculate_transaction_kpis(transactions_df))
+
+    print(f"{'per-KPI':>8}: best {legacy_time:.3f}s")
+    print(f"{'fused':>8}: best {fused_time:.3f}s")
+    if fused_time > 0:
+        print(f"speedup: {legacy_time / fused_time:.1f}x")
+
+    mismatched = [key for key in legacy if legacy[key] != fused.get(key)]
+    if mismatched:
+        for key in mismatched:
+            print(f"MISMATCH {key}: per-KPI {legacy[key]!r}, fused {fused.get(key)!r}")
+        sys.exit(1)
+    print("metrics match")
+
+
+if __name__ == '__main__':
+    main()